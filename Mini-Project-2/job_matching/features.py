@@ -0,0 +1,158 @@
+import math
+import re
+import zlib
+from collections import Counter, namedtuple
+
+import numpy as np
+from scipy import sparse
+
+from resume_processing.sections import classify_sentences
+from .models import ResumeFeatures
+
+TERM_SPACE = 2 ** 20
+MAX_EXPERIENCE_YEARS = 40.0
+
+TOKEN_RE = re.compile(r'[a-z][a-z0-9+#.]*')
+YEAR_RE = re.compile(r'\b(19[5-9]\d|20\d\d)\b')
+
+# Highest level first; word boundaries keep "Scrum Master" or "sales associate" out
+EDUCATION_LEVELS = [
+    (4, re.compile(r"\bph\.?\s?d\b|\bdoctorate\b|\bdoctor\s+of\b", re.IGNORECASE)),
+    (3, re.compile(
+        r"\bmaster(?:'s|s)?\s+(?:of|in|degree)\b|\bmaster's\b|\bm\.?sc\b|\bmba\b|\bm\.[as]\.(?!\w)", re.IGNORECASE
+    )),
+    (2, re.compile(r"\bbachelor(?:'s|s)?\b|\bb\.?sc\b|\bb\.[as]\.(?!\w)|\bundergraduate\b", re.IGNORECASE)),
+    (1, re.compile(
+        r"\bassociate(?:'s)?\s+(?:of|in|degree)\b|\bdiploma\b|\bhigh\s+school\b|\bcollege\b", re.IGNORECASE
+    )),
+]
+
+LoadedFeatures = namedtuple(
+    'LoadedFeatures', ['resume_ids', 'skill_ids', 'experience', 'education', 'tfidf']
+)
+
+
+def normalize_skill(skill):
+    return ' '.join(str(skill).lower().split())
+
+
+def skill_hash(name):
+    # Stable across processes, unlike hash()
+    return zlib.crc32(name.encode('utf-8'))
+
+
+def encode(values, dtype):
+    return np.asarray(values, dtype=dtype).tobytes()
+
+
+def decode(data, dtype):
+    return np.frombuffer(bytes(data), dtype=dtype)
+
+
+def skill_ids(skills):
+    names = {normalize_skill(skill) for skill in skills or []} - {''}
+    return sorted(skill_hash(name) for name in names)
+
+
+def experience_years(experience):
+    years = [int(year) for entry in experience or [] for year in YEAR_RE.findall(str(entry))]
+    if not years:
+        return 0.0
+    return float(min(max(years) - min(years), MAX_EXPERIENCE_YEARS))
+
+
+def education_level(education, text=''):
+    # Only education entries count, not degree words elsewhere in the resume
+    lines = [line for line in text.splitlines() if line.strip()]
+    entries = [str(entry) for entry in education or []] + classify_sentences(lines)['education']
+    for level, pattern in EDUCATION_LEVELS:
+        if any(pattern.search(entry) for entry in entries):
+            return level
+    return 0
+
+
+def term_frequencies(text, stop_words=frozenset()):
+    counts = Counter(
+        zlib.crc32(token.encode('utf-8')) % TERM_SPACE
+        for token in TOKEN_RE.findall(text.lower())
+        if token not in stop_words
+    )
+    term_ids = sorted(counts)
+    # Sublinear tf; idf is applied over the whole corpus at load time
+    weights = [1.0 + math.log(counts[term]) for term in term_ids]
+    return term_ids, weights
+
+
+def build_features(resume_id, result, text, stop_words=frozenset()):
+    term_ids, weights = term_frequencies(text, stop_words)
+    return ResumeFeatures(
+        resume_id=resume_id,
+        skill_ids=encode(skill_ids(result['skills']), '<u4'),
+        experience_years=experience_years(result['experience']),
+        education_level=education_level(result['education'], text),
+        term_ids=encode(term_ids, '<u4'),
+        term_weights=encode(weights, '<f4'),
+    )
+
+
+def save_features(features):
+    ResumeFeatures.objects.bulk_create(
+        features,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['resume'],
+        update_fields=['skill_ids', 'experience_years', 'education_level', 'term_ids', 'term_weights', 'updated_at'],
+    )
+
+
+def corpus_idf(term_rows):
+    # Smooth idf over the documents in term_rows
+    indices = [term_ids for term_ids, _ in term_rows]
+    indices = np.concatenate(indices).astype(np.int64) if indices else np.empty(0, dtype=np.int64)
+    df = np.bincount(indices, minlength=TERM_SPACE)
+    return np.log((1 + len(term_rows)) / (1 + df)).astype(np.float32) + 1
+
+
+def tfidf_matrix(term_rows, idf):
+    """Stack (term_ids, weights) rows into an L2-normalized TF-IDF matrix."""
+    indptr = np.cumsum([0] + [len(term_ids) for term_ids, _ in term_rows], dtype=np.int64)
+    if term_rows:
+        indices = np.concatenate([term_ids for term_ids, _ in term_rows]).astype(np.int32)
+        data = np.concatenate([weights for _, weights in term_rows]).astype(np.float32)
+    else:
+        indices, data = np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    tf = sparse.csr_matrix((data, indices, indptr), shape=(len(term_rows), TERM_SPACE))
+    tf.data *= idf[tf.indices]
+    norms = np.sqrt(np.asarray(tf.multiply(tf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ tf).tocsr()
+
+
+def load_features(resume_ids=None, idf=None):
+    """Load feature records into arrays for the match engine in one pass.
+
+    Term weights are scaled by ``idf``, or by idf over the loaded resumes
+    when none is given.
+    """
+    features = ResumeFeatures.objects.all()
+    if resume_ids is not None:
+        features = features.filter(resume_id__in=resume_ids)
+    rows = features.values_list(
+        'resume_id', 'skill_ids', 'experience_years', 'education_level', 'term_ids', 'term_weights'
+    )
+
+    ids, skills, experience, education, terms = [], [], [], [], []
+    for resume_id, skill_data, years, level, term_data, weight_data in rows.iterator(chunk_size=5000):
+        ids.append(resume_id)
+        skills.append(decode(skill_data, '<u4'))
+        experience.append(years)
+        education.append(level)
+        terms.append((decode(term_data, '<u4'), decode(weight_data, '<f4')))
+
+    return LoadedFeatures(
+        resume_ids=np.asarray(ids, dtype=np.int64),
+        skill_ids=skills,
+        experience=np.asarray(experience, dtype=np.float32) / MAX_EXPERIENCE_YEARS,
+        education=np.asarray(education, dtype=np.int8),
+        tfidf=tfidf_matrix(terms, corpus_idf(terms) if idf is None else idf),
+    )
@@ -0,0 +1,112 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import JobApplication, JobMatch
+
+VERSION_KEY = 'job_feed:version'
+HITS_KEY = 'job_feed:hits'
+MISSES_KEY = 'job_feed:misses'
+
+
+def _incr(key):
+    # incr fails on missing keys, so seed the counter first
+    cache.add(key, 0, None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+        return 1
+
+
+def feed_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate_feed():
+    # Bumping the version orphans every cached page at once
+    _incr(VERSION_KEY)
+
+
+def feed_key(query_params):
+    params = '&'.join(f'{key}={value}' for key, value in sorted(query_params.items()))
+    digest = hashlib.md5(params.encode()).hexdigest()
+    return f'job_feed:v{feed_version()}:{digest}'
+
+
+def get_feed(query_params):
+    payload = cache.get(feed_key(query_params))
+    _incr(HITS_KEY if payload is not None else MISSES_KEY)
+    return payload
+
+
+def set_feed(query_params, payload):
+    cache.set(feed_key(query_params), payload, getattr(settings, 'JOB_FEED_CACHE_TIMEOUT', 300))
+
+
+def relative_links(payload):
+    # Cursor links are built from the requesting host; cache only path and query
+    if isinstance(payload, dict):
+        for name in ('next', 'previous'):
+            if payload.get(name):
+                parts = urlsplit(payload[name])
+                payload[name] = urlunsplit(('', '', parts.path, parts.query, ''))
+    return payload
+
+
+def absolute_links(payload, request):
+    if isinstance(payload, dict):
+        for name in ('next', 'previous'):
+            if payload.get(name):
+                payload[name] = request.build_absolute_uri(payload[name])
+    return payload
+
+
+def overlay_application_counts(payload):
+    # Applications change far more often than jobs, so counts are not cached
+    jobs = payload['results'] if isinstance(payload, dict) else payload
+    if not jobs:
+        return payload
+    counts = dict(
+        JobApplication.objects.filter(job_id__in=[job['id'] for job in jobs])
+        .values('job_id')
+        .annotate(count=Count('id'))
+        .values_list('job_id', 'count')
+    )
+    for job in jobs:
+        job['applications_count'] = counts.get(job['id'], 0)
+    return payload
+
+
+def overlay_match_scores(payload, user):
+    jobs = payload['results'] if isinstance(payload, dict) else payload
+    if not user.is_authenticated or not jobs:
+        return payload
+    scores = dict(
+        JobMatch.objects.filter(job_id__in=[job['id'] for job in jobs], resume__user=user)
+        .values('job_id')
+        .annotate(score=Max('match_score'))
+        .values_list('job_id', 'score')
+    )
+    for job in jobs:
+        job['match_score'] = scores.get(job['id'])
+    return payload
+
+
+def feed_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'version': feed_version(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
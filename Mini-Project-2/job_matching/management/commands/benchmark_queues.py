@@ -0,0 +1,83 @@
+import statistics
+import time
+from contextlib import ExitStack
+
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+from django.core.management.base import BaseCommand
+
+
+def build_app(routed, nlp_seconds):
+    app = Celery('queue_benchmark', broker='memory://', backend='cache+memory://')
+    app.conf.broker_transport_options = {'polling_interval': 0.01}
+    app.conf.worker_prefetch_multiplier = 1
+    if routed:
+        app.conf.task_routes = {
+            'benchmark.nlp': {'queue': 'nlp'},
+            'benchmark.notify': {'queue': 'notifications'},
+        }
+
+    @app.task(name='benchmark.nlp', acks_late=True)
+    def nlp():
+        time.sleep(nlp_seconds)
+
+    @app.task(name='benchmark.notify')
+    def notify(sent_at):
+        return time.time() - sent_at
+
+    return app, nlp, notify
+
+
+def run_scenario(routed, nlp_tasks, notify_tasks, nlp_seconds, concurrency):
+    app, nlp, notify = build_app(routed, nlp_seconds)
+    if routed:
+        # Same total concurrency, split between the two queues
+        nlp_workers = max(concurrency // 2, 1)
+        workers = [['nlp']] * nlp_workers + [['notifications']] * max(concurrency - nlp_workers, 1)
+    else:
+        workers = [None] * concurrency
+    with ExitStack() as stack:
+        # One solo worker per slot: the memory transport has no event loop, so
+        # a threads pool only acks between 2s polls once its prefetch is full,
+        # which swamps the latency being measured
+        for queues in workers:
+            stack.enter_context(start_worker(app, pool='solo', queues=queues, perform_ping_check=False))
+
+        # A burst of uploads lands just before the notifications
+        heavy = [nlp.delay() for _ in range(nlp_tasks)]
+        light = [notify.delay(time.time()) for _ in range(notify_tasks)]
+        latencies = sorted(result.get(timeout=600) for result in light)
+        for result in heavy:
+            result.get(timeout=600)
+    return latencies
+
+
+class Command(BaseCommand):
+    help = 'Measure notification queue latency under an NLP burst, shared vs routed queues'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nlp-tasks', type=int, default=40)
+        parser.add_argument('--notify-tasks', type=int, default=20)
+        parser.add_argument('--nlp-seconds', type=float, default=0.1)
+        parser.add_argument('--concurrency', type=int, default=4)
+
+    def handle(self, *args, **options):
+        # The unloaded run shows the harness overhead; it should be near zero
+        scenarios = (
+            ('unloaded', False, 0),
+            ('shared queue', False, options['nlp_tasks']),
+            ('routed queues', True, options['nlp_tasks']),
+        )
+        for label, routed, nlp_tasks in scenarios:
+            latencies = run_scenario(
+                routed,
+                nlp_tasks,
+                options['notify_tasks'],
+                options['nlp_seconds'],
+                options['concurrency'],
+            )
+            p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+            self.stdout.write(
+                f'{label:>14}: notify latency p50={statistics.median(latencies):.3f}s '
+                f'p95={p95:.3f}s max={latencies[-1]:.3f}s'
+            )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from job_matching.features import build_features, save_features
+from job_matching.models import ResumeAnalysis
+from resume_processing.content_cache import file_hash, get_entry
+from resume_processing.extraction import extract_text_from_file
+from resume_processing.nlp import registry
+
+
+class Command(BaseCommand):
+    help = 'Build ResumeFeatures rows for every analyzed resume'
+
+    def handle(self, *args, **options):
+        batch = []
+        count = 0
+        analyses = ResumeAnalysis.objects.select_related('resume').iterator(chunk_size=500)
+        for analysis in analyses:
+            path = analysis.resume.file.path
+            entry = get_entry(file_hash(path))
+            text = entry['text'] if entry is not None else extract_text_from_file(path)
+            result = {'skills': analysis.skills, 'experience': analysis.experience, 'education': analysis.education}
+            batch.append(build_features(analysis.resume_id, result, text, registry.stop_words))
+            if len(batch) >= 500:
+                save_features(batch)
+                count += len(batch)
+                batch = []
+        save_features(batch)
+        count += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Built features for {count} resumes'))
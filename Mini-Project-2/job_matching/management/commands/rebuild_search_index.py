@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from job_matching.models import Job
+from job_matching.search import JOB_SEARCH_VECTOR, update_search_index, uses_postgres
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for all jobs'
+
+    def handle(self, *args, **options):
+        if uses_postgres():
+            count = Job.objects.update(search_vector=JOB_SEARCH_VECTOR)
+        else:
+            count = 0
+            for job in Job.objects.only('id', 'title', 'description', 'requirements').iterator(chunk_size=2000):
+                update_search_index(job)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} jobs for search'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from job_matching.models import Job
+from job_matching.skill_index import index_job_skills
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the JobSkill inverted index from Job.skills_required'
+
+    def handle(self, *args, **options):
+        count = 0
+        for job in Job.objects.only('id', 'skills_required').iterator(chunk_size=2000):
+            index_job_skills(job)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Indexed skills for {count} jobs'))
@@ -0,0 +1,285 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from scipy import sparse
+
+from resume_processing.nlp import registry
+from .features import (
+    EDUCATION_LEVELS, MAX_EXPERIENCE_YEARS, corpus_idf, load_features, normalize_skill, skill_hash,
+    term_frequencies, tfidf_matrix,
+)
+from .models import Job, JobApplication, JobMatch
+
+# Years of experience each level asks for; meeting it gives a full fit
+EXPERIENCE_YEARS = {'EN': 0, 'JR': 1, 'MD': 3, 'SR': 5, 'LD': 7, 'MG': 7}
+MAX_EDUCATION_LEVEL = EDUCATION_LEVELS[0][0]
+MATCH_WEIGHTS = {'skills': 0.65, 'text': 0.2, 'experience': 0.1, 'education': 0.05}
+
+JobProfiles = namedtuple('JobProfiles', ['skills', 'vocabulary', 'tfidf', 'idf', 'experience'])
+
+
+class SkillVocabulary:
+    """Maps skill hashes to column indices shared by all matrices."""
+
+    def __init__(self):
+        self.index = {}
+
+    def __len__(self):
+        return len(self.index)
+
+    def ids(self, skills, grow=True):
+        names = {normalize_skill(skill) for skill in skills or []} - {''}
+        return self.hash_ids([skill_hash(name) for name in names], grow)
+
+    def hash_ids(self, hashes, grow=True):
+        cols = set()
+        for value in hashes:
+            col = self.index.get(int(value))
+            if col is None:
+                if not grow:
+                    continue
+                col = self.index[int(value)] = len(self.index)
+            cols.add(col)
+        return sorted(cols)
+
+
+class SkillMatrix:
+    """Sparse 0/1 matrix with one row per object and one column per skill."""
+
+    def __init__(self, ids, matrix):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.matrix = matrix.tocsr()
+        self.sizes = np.diff(self.matrix.indptr)
+
+    @classmethod
+    def build(cls, rows, vocabulary, grow=True, hashed=False):
+        lookup = vocabulary.hash_ids if hashed else vocabulary.ids
+        ids = []
+        indices = []
+        indptr = [0]
+        for obj_id, skills in rows:
+            ids.append(obj_id)
+            indices.extend(lookup(skills, grow))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        matrix = sparse.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(ids), len(vocabulary)),
+        )
+        return cls(ids, matrix)
+
+    def overlap(self, cols):
+        vector = np.zeros(self.matrix.shape[1], dtype=np.float32)
+        cols = [col for col in cols if col < self.matrix.shape[1]]
+        vector[cols] = 1.0
+        return self.matrix @ vector
+
+
+def top_k(scores, k):
+    # argpartition keeps selection linear in the number of candidates
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return candidates[scores[candidates] > 0]
+
+
+def job_terms(title, description, requirements):
+    return term_frequencies(' '.join((title, description, requirements)), registry.stop_words)
+
+
+def experience_fit(years, required):
+    required = np.asarray(required, dtype=np.float32)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(required > 0, np.minimum(years / required, 1.0), 1.0)
+
+
+def blend(skills, text, experience, education):
+    weights = getattr(settings, 'JOB_MATCH_WEIGHTS', MATCH_WEIGHTS)
+    scores = (
+        weights['skills'] * skills
+        + weights['text'] * text
+        + weights['experience'] * experience
+        + weights['education'] * education
+    )
+    # Experience and education only order candidates that share skills or terms
+    return np.where((skills > 0) | (text > 0), scores, 0.0) * 100
+
+
+class MatchEngine:
+    """Scores resumes against active jobs with sparse matrix products.
+
+    Scores blend skill overlap, TF-IDF similarity of resume and job text,
+    experience and education from the feature store. The job profiles are
+    built once per process and rebuilt only when the set of active jobs
+    changes; their idf weights both sides of the text similarity.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.profiles = None
+        self.version = None
+
+    def _jobs_version(self):
+        return tuple(
+            Job.objects.filter(is_active=True)
+            .aggregate(count=Count('id'), latest=Max('updated_at'))
+            .values()
+        )
+
+    def job_matrix(self):
+        version = self._jobs_version()
+        with self._lock:
+            if self.profiles is None or version != self.version:
+                rows = Job.objects.filter(is_active=True).values_list(
+                    'id', 'skills_required', 'title', 'description', 'requirements', 'experience_level'
+                )
+                skills, terms, experience = [], [], []
+                for job_id, skills_required, title, description, requirements, level in rows.iterator(chunk_size=5000):
+                    skills.append((job_id, skills_required))
+                    terms.append(job_terms(title, description, requirements))
+                    experience.append(EXPERIENCE_YEARS.get(level, 0))
+                vocabulary = SkillVocabulary()
+                idf = corpus_idf(terms)
+                self.profiles = JobProfiles(
+                    skills=SkillMatrix.build(skills, vocabulary),
+                    vocabulary=vocabulary,
+                    tfidf=tfidf_matrix(terms, idf),
+                    idf=idf,
+                    experience=np.asarray(experience, dtype=np.float32),
+                )
+                self.version = version
+            return self.profiles
+
+    def score_resume(self, resume_id):
+        profiles = self.job_matrix()
+        jobs = profiles.skills
+        features = load_features([resume_id], profiles.idf)
+        if not len(features.resume_ids):
+            return jobs.ids, np.zeros(len(jobs.ids))
+        overlap = jobs.overlap(profiles.vocabulary.hash_ids(features.skill_ids[0], grow=False))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            skills = np.where(jobs.sizes > 0, overlap / jobs.sizes, 0.0)
+        text = (profiles.tfidf @ features.tfidf[0].T).toarray().ravel()
+        experience = experience_fit(features.experience[0] * MAX_EXPERIENCE_YEARS, profiles.experience)
+        return jobs.ids, blend(skills, text, experience, features.education[0] / MAX_EDUCATION_LEVEL)
+
+    def score_job(self, job, resume_ids=None):
+        profiles = self.job_matrix()
+        features = load_features(resume_ids, profiles.idf)
+        vocabulary = SkillVocabulary()
+        cols = vocabulary.ids(job.skills_required)
+        resumes = SkillMatrix.build(zip(features.resume_ids, features.skill_ids), vocabulary, grow=False, hashed=True)
+        skills = resumes.overlap(cols) / len(cols) if cols else np.zeros(len(resumes.ids))
+        job_vector = tfidf_matrix([job_terms(job.title, job.description, job.requirements)], profiles.idf)
+        text = (features.tfidf @ job_vector.T).toarray().ravel()
+        experience = experience_fit(
+            features.experience * MAX_EXPERIENCE_YEARS, EXPERIENCE_YEARS.get(job.experience_level, 0)
+        )
+        return features.resume_ids, blend(skills, text, experience, features.education / MAX_EDUCATION_LEVEL)
+
+
+engine = MatchEngine()
+
+
+def match_resume(resume_id, k=None):
+    k = k or getattr(settings, 'JOB_MATCH_TOP_K', 50)
+    job_ids, scores = engine.score_resume(resume_id)
+    matches = [
+        JobMatch(job_id=int(job_ids[i]), resume_id=resume_id, match_score=float(scores[i]))
+        for i in top_k(scores, k)
+    ]
+    hold_top_k(matches, 'resume_top_k', 'job_id', resume_id=resume_id)
+    return len(matches)
+
+
+def match_job(job_id, k=None):
+    k = k or getattr(settings, 'JOB_MATCH_TOP_K', 50)
+    job = Job.objects.get(id=job_id)
+    resume_ids, scores = engine.score_job(job)
+    matches = [
+        JobMatch(job_id=job_id, resume_id=int(resume_ids[i]), match_score=float(scores[i]))
+        for i in top_k(scores, k)
+    ]
+    hold_top_k(matches, 'job_top_k', 'resume_id', job_id=job_id)
+    return len(matches)
+
+
+def skill_set(skills):
+    return {normalize_skill(skill) for skill in skills or []} - {''}
+
+
+def match_inputs(job):
+    # Everything score_job reads from a job; a change to any of it needs a rematch
+    return (
+        skill_set(job.skills_required),
+        job.title,
+        job.description,
+        job.requirements,
+        EXPERIENCE_YEARS.get(job.experience_level, 0),
+    )
+
+
+def rematch_job(job_id, k=None):
+    """Recompute one job's column of scores after an edit that affects matching."""
+    k = k or getattr(settings, 'JOB_MATCH_TOP_K', 50)
+    job = Job.objects.get(id=job_id)
+    resume_ids, scores = engine.score_job(job)
+    column = dict(zip(resume_ids.tolist(), scores.tolist()))
+
+    matches = [
+        JobMatch(job_id=job_id, resume_id=int(resume_ids[i]), match_score=float(scores[i]))
+        for i in top_k(scores, k)
+    ]
+    now = timezone.now()
+    # Rows that only resumes' own top-K hold stay, with the new score
+    held = list(
+        JobMatch.objects.filter(job_id=job_id, resume_top_k=True)
+        .exclude(resume_id__in=[match.resume_id for match in matches])
+        .only('id', 'resume_id', 'match_score')
+    )
+    for match in held:
+        match.match_score = column.get(match.resume_id, 0.0)
+        match.updated_at = now
+    applications = list(JobApplication.objects.filter(job_id=job_id).only('id', 'resume_id', 'match_score'))
+    for application in applications:
+        application.match_score = column.get(application.resume_id)
+        application.updated_at = now
+
+    with transaction.atomic():
+        hold_top_k(matches, 'job_top_k', 'resume_id', job_id=job_id)
+        JobMatch.objects.bulk_update(held, ['match_score', 'updated_at'], batch_size=1000)
+        JobApplication.objects.bulk_update(applications, ['match_score', 'updated_at'], batch_size=1000)
+    return len(matches) + len(held) + len(applications)
+
+
+def hold_top_k(matches, flag, other, **owner):
+    """Save ``matches`` as the top-K that one side holds and release the rest.
+
+    ``owner`` selects that side's rows (one resume or one job) and ``other``
+    names the column that tells them apart. The resume-side and job-side
+    lists share rows, so a released row is deleted only when the other
+    list does not hold it either.
+    """
+    for match in matches:
+        setattr(match, flag, True)
+    with transaction.atomic():
+        (
+            JobMatch.objects.filter(**owner, **{flag: True})
+            .exclude(**{f'{other}__in': [getattr(match, other) for match in matches]})
+            .update(**{flag: False})
+        )
+        JobMatch.objects.filter(**owner, resume_top_k=False, job_top_k=False).delete()
+        JobMatch.objects.bulk_create(
+            matches,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['job', 'resume'],
+            update_fields=['match_score', flag, 'updated_at'],
+        )
@@ -1,7 +1,22 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
 
+class JobQuerySet(models.QuerySet):
+    def with_listing_data(self, user=None):
+        # Everything JobSerializer reads, fetched in the listing query itself
+        jobs = self.select_related('recruiter').annotate(
+            applications_count=models.Count('applications', distinct=True)
+        )
+        if user is not None and user.is_authenticated:
+            match = JobMatch.objects.filter(job=models.OuterRef('pk'), resume__user=user)
+            return jobs.annotate(
+                match_score=models.Subquery(match.order_by('-match_score').values('match_score')[:1])
+            )
+        return jobs.annotate(match_score=models.Value(None, output_field=models.FloatField()))
+
 class Job(models.Model):
     # Simple choices for job type and experience level
     JOB_TYPES = [
@@ -33,12 +48,39 @@ class Job(models.Model):
     experience_level = models.CharField(max_length=2, choices=EXPERIENCE_LEVELS)
     skills_required = models.JSONField(default=list)
     is_active = models.BooleanField(default=True)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector']),
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_created_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
+class JobSkill(models.Model):
+    # Inverted index of Job.skills_required, one row per normalized skill
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='skill_index')
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ('job', 'name')
+        indexes = [
+            models.Index(fields=['name', 'job']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} for {self.job.title}"
+
 class JobApplication(models.Model):
     # Simple status choices
     STATUS_CHOICES = [
@@ -50,7 +92,7 @@ class JobApplication(models.Model):
     ]
 
     # Basic application fields
-    job = models.ForeignKey(Job, on_delete=models.CASCADE)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
     applicant = models.ForeignKey(User, on_delete=models.CASCADE)
     resume = models.ForeignKey('Resume', on_delete=models.CASCADE)
     cover_letter = models.TextField(blank=True)
@@ -59,6 +101,13 @@ class JobApplication(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['applicant', '-created_at', '-id'], name='application_applicant_idx'),
+            models.Index(fields=['job', '-created_at', '-id'], name='application_job_idx'),
+            models.Index(fields=['job', '-match_score'], name='application_job_score_idx'),
+        ]
+
     def __str__(self):
         return f"{self.applicant.username}'s application for {self.job.title}"
 
@@ -76,6 +125,9 @@ class Resume(models.Model):
     def __str__(self):
         return self.title
 
+# Bump when the analysis pipeline changes so existing resumes are re-analyzed
+ANALYSIS_VERSION = 2
+
 class ResumeAnalysis(models.Model):
     # Basic analysis fields
     resume = models.OneToOneField(Resume, on_delete=models.CASCADE)
@@ -83,12 +135,26 @@ class ResumeAnalysis(models.Model):
     experience = models.JSONField(default=list)
     education = models.JSONField(default=list)
     overall_score = models.FloatField(default=0.0)
+    analysis_version = models.PositiveIntegerField(default=ANALYSIS_VERSION)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Analysis for {self.resume.title}"
 
+class ResumeFeatures(models.Model):
+    # Compact match-engine inputs derived from ResumeAnalysis, stored as raw arrays
+    resume = models.OneToOneField(Resume, on_delete=models.CASCADE, primary_key=True, related_name='features')
+    skill_ids = models.BinaryField()
+    experience_years = models.FloatField(default=0.0)
+    education_level = models.PositiveSmallIntegerField(default=0)
+    term_ids = models.BinaryField()
+    term_weights = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features for {self.resume.title}"
+
 class ResumeFeedback(models.Model):
     # Basic feedback fields
     resume = models.ForeignKey(Resume, on_delete=models.CASCADE)
@@ -100,6 +166,26 @@ class ResumeFeedback(models.Model):
     def __str__(self):
         return f"{self.feedback_type} feedback for {self.resume.title}"
 
+class JobMatch(models.Model):
+    # Precomputed score of how well a resume covers a job's required skills
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='matches')
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='matches')
+    match_score = models.FloatField(default=0.0)
+    # Which top-K lists hold the row; it is deleted once neither does
+    resume_top_k = models.BooleanField(default=False)
+    job_top_k = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('job', 'resume')
+        indexes = [
+            models.Index(fields=['resume', '-match_score']),
+        ]
+
+    def __str__(self):
+        return f"{self.resume.title} matches {self.job.title} ({self.match_score:.1f})"
+
 class SavedJob(models.Model):
     # Simple saved job model
     user = models.ForeignKey(User, on_delete=models.CASCADE)
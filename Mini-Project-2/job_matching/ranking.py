@@ -0,0 +1,64 @@
+import heapq
+
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .matching import engine
+from .models import JobApplication
+
+# Tie-breaker name -> annotated attribute, compared descending
+TIE_BREAKERS = {
+    'recent': 'created_at',
+    'education': 'education_level',
+}
+
+
+def rank_key(application, tie_breakers):
+    key = [application.match_score or 0.0]
+    for tie_breaker in tie_breakers:
+        value = getattr(application, TIE_BREAKERS[tie_breaker])
+        key.append(value.timestamp() if tie_breaker == 'recent' else value or 0)
+    key.append(-application.id)
+    return tuple(key)
+
+
+def rank_ordering(tie_breakers):
+    # Mirrors rank_key so the SQL top-K and the merge below agree
+    return ['-match_score', *(f'-{TIE_BREAKERS[tie_breaker]}' for tie_breaker in tie_breakers), 'id']
+
+
+def score_missing(job, applications):
+    # Score applications analyzed after the last match run and keep the results
+    resume_ids = {application.resume_id for application in applications}
+    ids, scores = engine.score_job(job, resume_ids)
+    column = dict(zip(ids.tolist(), scores.tolist()))
+    now = timezone.now()
+    for application in applications:
+        application.match_score = column.get(application.resume_id)
+        application.updated_at = now
+    JobApplication.objects.bulk_update(
+        [application for application in applications if application.match_score is not None],
+        ['match_score', 'updated_at'],
+    )
+    return applications
+
+
+def ranked_applicants(job, k, tie_breakers=()):
+    applications = (
+        JobApplication.objects.filter(job=job)
+        .select_related('applicant')
+        .annotate(education_level=Coalesce(F('resume__features__education_level'), 0))
+    )
+
+    tie_breakers = list(dict.fromkeys(tie_breakers))
+    # Served by the (job, match_score DESC) index
+    scored = list(applications.filter(match_score__isnull=False).order_by(*rank_ordering(tie_breakers))[:k])
+
+    # Resumes without features cannot be scored yet; they are ranked once
+    # their analysis has stored features
+    unscored = list(applications.filter(match_score__isnull=True, resume__features__isnull=False))
+    if not unscored:
+        return scored
+    candidates = scored + score_missing(job, unscored)
+    return heapq.nlargest(k, candidates, key=lambda application: rank_key(application, tie_breakers))
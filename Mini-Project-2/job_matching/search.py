@@ -0,0 +1,79 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, connections
+from django.db.models import F
+
+from .models import Job
+
+FTS_TABLE = 'job_matching_job_fts'
+
+JOB_SEARCH_VECTOR = (
+    SearchVector('title', weight='A')
+    + SearchVector('requirements', weight='B')
+    + SearchVector('description', weight='C')
+)
+
+
+def uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def create_search_table(using='default', **kwargs):
+    # post_migrate handler: the SQLite fallback used by local runs and tests
+    # keeps its index in an FTS5 table that Django models cannot declare
+    if connections[using].vendor != 'sqlite':
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(title, description, requirements)"
+        )
+        # Column weights for the built-in rank column: title, description, requirements
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 1.0, 5.0)')")
+
+
+def update_search_index(job):
+    if uses_postgres():
+        Job.objects.filter(pk=job.pk).update(search_vector=JOB_SEARCH_VECTOR)
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, description, requirements) "
+            "VALUES (%s, %s, %s, %s)",
+            [job.pk, job.title, job.description, job.requirements],
+        )
+
+
+def remove_from_search_index(job):
+    if uses_postgres():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [job.pk])
+
+
+def search_jobs(jobs, query):
+    """Filter ``jobs`` to full-text matches for ``query``, best first."""
+    if uses_postgres():
+        search_query = SearchQuery(query, search_type='websearch')
+        return (
+            jobs.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F('search_vector'), search_query))
+            .order_by('-rank', '-created_at', '-id')
+        )
+
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return jobs.none()
+    match = ' '.join(f'"{term}"' for term in terms)
+    # Join the FTS table so the weighted bm25 rank comes from the same query;
+    # it is lower-is-better, so negate it to sort like SearchRank
+    return (
+        jobs.extra(
+            select={'rank': f'-{FTS_TABLE}.rank'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {Job._meta.db_table}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        )
+        .order_by('-rank', '-created_at', '-id')
+    )
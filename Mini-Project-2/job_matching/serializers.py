@@ -15,19 +15,23 @@ class JobSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Job
-        fields = '__all__'
+        exclude = ('search_vector',)
         read_only_fields = ('created_at', 'updated_at')
 
     def get_applications_count(self, obj):
+        if hasattr(obj, 'applications_count'):
+            return obj.applications_count
         return obj.applications.count()
 
     def get_match_score(self, obj):
+        if hasattr(obj, 'match_score'):
+            return obj.match_score
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             try:
-                match = JobMatch.objects.get(job=obj, resume__user=request.user)
+                match = JobMatch.objects.filter(job=obj, resume__user=request.user).order_by('-match_score')[0]
                 return match.match_score
-            except JobMatch.DoesNotExist:
+            except IndexError:
                 return None
         return None
 
@@ -41,6 +45,14 @@ class JobApplicationSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('created_at', 'updated_at', 'status', 'match_score')
 
+class RankedApplicantSerializer(serializers.ModelSerializer):
+    applicant = UserSerializer(read_only=True)
+    education_level = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = JobApplication
+        fields = ['id', 'applicant', 'resume', 'status', 'match_score', 'education_level', 'created_at']
+
 class JobMatchSerializer(serializers.ModelSerializer):
     job = JobSerializer(read_only=True)
     resume = ResumeSerializer(read_only=True)
@@ -77,12 +89,18 @@ class JobApplicationCreateSerializer(serializers.ModelSerializer):
 
         return data
 
+class BulkApplicationReviewSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+    status = serializers.ChoiceField(choices=JobApplication.STATUS_CHOICES)
+
 class JobSearchSerializer(serializers.Serializer):
+    query = serializers.CharField(required=False)
     title = serializers.CharField(required=False)
     location = serializers.CharField(required=False)
     job_type = serializers.ChoiceField(choices=Job.JOB_TYPES, required=False)
     experience_level = serializers.ChoiceField(choices=Job.EXPERIENCE_LEVELS, required=False)
     skills = serializers.ListField(child=serializers.CharField(), required=False)
+    skills_mode = serializers.ChoiceField(choices=['any', 'all'], default='all')
     salary_min = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
     salary_max = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
 
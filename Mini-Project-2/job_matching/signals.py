@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .feed_cache import invalidate_feed
+from .models import Job
+from .search import remove_from_search_index, update_search_index
+from .skill_index import index_job_skills
+
+
+@receiver(post_save, sender=Job)
+def update_job_skill_index(sender, instance, **kwargs):
+    index_job_skills(instance)
+
+
+@receiver(post_save, sender=Job)
+def update_job_search_index(sender, instance, **kwargs):
+    update_search_index(instance)
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_search_index(sender, instance, **kwargs):
+    remove_from_search_index(instance)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_feed(sender, instance, **kwargs):
+    invalidate_feed()
@@ -0,0 +1,81 @@
+import threading
+
+from resume_processing.catalog import catalog_version
+from resume_processing.models import Skill
+
+from .features import normalize_skill
+from .models import JobSkill
+
+
+def index_job_skills(job):
+    names = {normalize_skill(skill)[:100] for skill in job.skills_required or []}
+    names.discard('')
+    existing = set(JobSkill.objects.filter(job=job).values_list('name', flat=True))
+    stale = existing - names
+    if stale:
+        JobSkill.objects.filter(job=job, name__in=stale).delete()
+    JobSkill.objects.bulk_create(
+        [JobSkill(job=job, name=name) for name in names - existing],
+        ignore_conflicts=True,
+    )
+
+
+def build_synonyms():
+    synonyms = {}
+    for name, aliases in Skill.objects.values_list('name', 'aliases').iterator(chunk_size=2000):
+        group = {normalize_skill(name)} | {normalize_skill(alias) for alias in aliases or []}
+        group.discard('')
+        for member in group:
+            synonyms.setdefault(member, set()).update(group)
+    return synonyms
+
+
+class SkillSynonyms:
+    """Synonym groups from the Skill catalog, built once per process.
+
+    Rebuilt when the catalog version changes, like the skill matcher.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.synonyms = None
+        self.version = None
+
+    def get(self):
+        version = catalog_version()
+        with self._lock:
+            if self.synonyms is None or version != self.version:
+                self.synonyms = build_synonyms()
+                self.version = version
+            return self.synonyms
+
+
+synonym_cache = SkillSynonyms()
+
+
+def skill_synonyms():
+    return synonym_cache.get()
+
+
+def expand_skills(skills):
+    """Return one set of accepted names per requested skill."""
+    synonyms = skill_synonyms()
+    groups = []
+    for skill in skills:
+        name = normalize_skill(skill)
+        if name:
+            groups.append(synonyms.get(name, {name}))
+    return groups
+
+
+def filter_jobs_by_skills(jobs, skills, mode='all'):
+    groups = expand_skills(skills)
+    if not groups:
+        return jobs
+    if mode == 'any':
+        names = set().union(*groups)
+        return jobs.filter(id__in=JobSkill.objects.filter(name__in=names).values('job_id'))
+    # Intersect one posting list per requested skill
+    for names in groups:
+        jobs = jobs.filter(id__in=JobSkill.objects.filter(name__in=names).values('job_id'))
+    return jobs
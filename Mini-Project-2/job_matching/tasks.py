@@ -1,67 +1,228 @@
+import logging
+import uuid
+
 from celery import shared_task
-from .models import Resume, ResumeAnalysis, ResumeFeedback
-import PyPDF2
-import docx
-import spacy
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import send_mass_mail
+from django_redis import get_redis_connection
+from .models import ANALYSIS_VERSION, JobApplication, Resume, ResumeAnalysis, ResumeFeedback
+from .features import build_features, save_features
+from .matching import match_job, match_resume, rematch_job
+from resume_processing.content_cache import doc_entities, file_hash, get_entry, get_result, pipeline_version, store_result
+from resume_processing.extraction import extract_text_from_file
+from resume_processing.nlp import registry, track_inference
+from resume_processing.catalog import pipeline_key
+from resume_processing.skills import extract_skills
 
-@shared_task
-def analyze_resume(resume_id):
+# Keyed on ANALYSIS_VERSION: a version bump must miss the content cache,
+# or re-analysis gets the old result back
+PIPELINE = 'job_matching'
+PENDING_RESUMES_KEY = 'job_matching:pending_resumes'
+PENDING_FLUSH_KEY = 'job_matching:pending_resumes:scheduled'
+
+logger = logging.getLogger(__name__)
+
+def is_analyzed(resume_id):
+    return ResumeAnalysis.objects.filter(resume_id=resume_id, analysis_version__gte=ANALYSIS_VERSION).exists()
+
+def claim_analysis(resume_id):
+    # Drop triggers for resumes that are done or already queued
+    if is_analyzed(resume_id):
+        return False
+    timeout = getattr(settings, 'RESUME_ANALYSIS_LOCK_TIMEOUT', 600)
+    return cache.add(f'resume_analysis:inflight:{resume_id}', 1, timeout)
+
+def release_analysis(resume_ids):
+    cache.delete_many([f'resume_analysis:inflight:{resume_id}' for resume_id in resume_ids])
+
+def dispatch_resume_analysis(resume_id):
+    if not claim_analysis(resume_id):
+        return False
+    analyze_resume.delay(resume_id, claimed=True)
+    return True
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def analyze_resume(resume_id, claimed=False):
+    # Only a run started by dispatch_resume_analysis owns the in-flight claim
     try:
+        if is_analyzed(resume_id):
+            return True
         resume = Resume.objects.get(id=resume_id)
-        text = extract_text_from_file(resume.file.path)
-        
-        # Initialize NLP
-        nlp = spacy.load('en_core_web_sm')
-        nltk.download('punkt')
-        nltk.download('stopwords')
-        
-        # Extract information
-        doc = nlp(text)
-        skills = extract_skills(doc)
-        experience = extract_experience(doc)
-        education = extract_education(doc)
+
+        # Reuse results for files that were already analyzed
+        content_hash = file_hash(resume.file.path)
+        entry = get_entry(content_hash)
+        pipeline = pipeline_key(PIPELINE, pipeline_version(ANALYSIS_VERSION))
+        result = get_result(entry, pipeline)
+
+        text = entry['text'] if entry is not None else extract_text_from_file(resume.file.path)
+
+        if result is None:
+            # Extract information with the worker's warm model
+            with track_inference() as run:
+                doc = run.nlp(text)
+                result = analyze_doc(doc)
+            store_result(content_hash, pipeline, text, doc_entities(doc), result)
+
+        skills = result['skills']
+        experience = result['experience']
+        education = result['education']
         
         # Calculate score
         score = calculate_score(skills, experience, education)
         
-        # Create analysis
-        analysis = ResumeAnalysis.objects.create(
+        # Create analysis, replacing one from an older pipeline version
+        analysis, _ = ResumeAnalysis.objects.update_or_create(
             resume=resume,
-            skills=skills,
-            experience=experience,
-            education=education,
-            overall_score=score
+            defaults={
+                'skills': skills,
+                'experience': experience,
+                'education': education,
+                'overall_score': score,
+                'analysis_version': ANALYSIS_VERSION,
+            }
         )
         
         # Generate feedback
+        ResumeFeedback.objects.filter(resume=resume).delete()
         generate_feedback(resume, skills, experience, education)
+
+        save_features([build_features(resume.id, result, text, registry.stop_words)])
+        calculate_job_match.delay(resume.id)
         
         return True
-    except Exception as e:
-        print(f"Error analyzing resume: {str(e)}")
+    except Exception:
+        logger.exception("Error analyzing resume %s", resume_id)
         return False
+    finally:
+        if claimed:
+            release_analysis([resume_id])
 
-def extract_text_from_file(file_path):
-    if file_path.endswith('.pdf'):
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ''
-            for page in reader.pages:
-                text += page.extract_text()
-    elif file_path.endswith('.docx'):
-        doc = docx.Document(file_path)
-        text = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-    return text
-
-def extract_skills(doc):
-    skills = []
-    for ent in doc.ents:
-        if ent.label_ == 'SKILL':
-            skills.append(ent.text)
-    return skills
+def analyze_doc(doc):
+    return {
+        'skills': extract_skills(doc),
+        'experience': extract_experience(doc),
+        'education': extract_education(doc),
+    }
+
+def enqueue_resume_analysis(resume_id):
+    # Collect uploads for a short window and analyze them as one batch
+    if not claim_analysis(resume_id):
+        return False
+    window = getattr(settings, 'RESUME_BATCH_WINDOW', 5)
+    conn = get_redis_connection('default')
+    conn.rpush(PENDING_RESUMES_KEY, resume_id)
+    if conn.set(PENDING_FLUSH_KEY, 1, nx=True, ex=window * 10):
+        flush_resume_batch.apply_async(countdown=window)
+    return True
+
+@shared_task
+def flush_resume_batch():
+    conn = get_redis_connection('default')
+    pipe = conn.pipeline()
+    pipe.lrange(PENDING_RESUMES_KEY, 0, -1)
+    pipe.delete(PENDING_RESUMES_KEY)
+    pipe.delete(PENDING_FLUSH_KEY)
+    resume_ids, _, _ = pipe.execute()
+
+    resume_ids = sorted({int(resume_id) for resume_id in resume_ids})
+    max_size = getattr(settings, 'RESUME_BATCH_MAX_SIZE', 100)
+    for start in range(0, len(resume_ids), max_size):
+        analyze_resumes_batch.delay(resume_ids[start:start + max_size])
+    return len(resume_ids)
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def analyze_resumes_batch(resume_ids, batch_size=None, n_process=None, attempt=0):
+    failed = []
+    retry = []
+    try:
+        return run_resume_batch(resume_ids, batch_size, n_process, failed)
+    finally:
+        # Resumes that failed to load keep their claim and go round again
+        if attempt < getattr(settings, 'RESUME_BATCH_MAX_RETRIES', 3):
+            retry = failed
+        elif failed:
+            logger.error("Giving up on resumes %s after %d attempts", failed, attempt + 1)
+        release_analysis(set(resume_ids) - set(retry))
+        if retry:
+            analyze_resumes_batch.apply_async(
+                (retry, batch_size, n_process, attempt + 1),
+                countdown=getattr(settings, 'RESUME_BATCH_RETRY_DELAY', 60) * 2 ** attempt,
+            )
+
+def run_resume_batch(resume_ids, batch_size=None, n_process=None, failed=None):
+    batch_size = batch_size or getattr(settings, 'NLP_BATCH_SIZE', 32)
+    n_process = n_process or getattr(settings, 'NLP_N_PROCESS', 1)
+
+    results = {}
+    pending = []
+    pipeline = pipeline_key(PIPELINE, pipeline_version(ANALYSIS_VERSION))
+    analyzed = ResumeAnalysis.objects.filter(analysis_version__gte=ANALYSIS_VERSION).values('resume_id')
+    for resume in Resume.objects.filter(id__in=resume_ids).exclude(id__in=analyzed):
+        try:
+            content_hash = file_hash(resume.file.path)
+            entry = get_entry(content_hash)
+            result = get_result(entry, pipeline)
+            if result is not None:
+                results[resume.id] = (resume, result, entry['text'])
+                continue
+            text = entry['text'] if entry is not None else extract_text_from_file(resume.file.path)
+            pending.append((resume, content_hash, text))
+        except Exception:
+            logger.exception("Error extracting resume %s", resume.id)
+            if failed is not None:
+                failed.append(resume.id)
+
+    # Only files never seen before go through the NLP pipeline
+    if pending:
+        with track_inference() as run:
+            texts = [text for _, _, text in pending]
+            docs = run.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+            for (resume, content_hash, text), doc in zip(pending, docs):
+                result = analyze_doc(doc)
+                store_result(content_hash, pipeline, text, doc_entities(doc), result)
+                results[resume.id] = (resume, result, text)
+
+    analyses = []
+    feedback = []
+    features = []
+    for resume, result, text in results.values():
+        skills = result['skills']
+        experience = result['experience']
+        education = result['education']
+        analyses.append(ResumeAnalysis(
+            resume=resume,
+            skills=skills,
+            experience=experience,
+            education=education,
+            overall_score=calculate_score(skills, experience, education),
+            analysis_version=ANALYSIS_VERSION
+        ))
+        feedback.extend(build_feedback(resume, skills, experience, education))
+        features.append(build_features(resume.id, result, text, registry.stop_words))
+
+    ResumeAnalysis.objects.bulk_create(
+        analyses,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['resume'],
+        update_fields=['skills', 'experience', 'education', 'overall_score', 'analysis_version', 'updated_at'],
+    )
+    ResumeFeedback.objects.filter(resume_id__in=results).delete()
+    ResumeFeedback.objects.bulk_create(feedback, batch_size=500)
+    save_features(features)
+    for resume_id in results:
+        calculate_job_match.delay(resume_id)
+    return len(analyses)
+
+@shared_task
+def calculate_job_match(resume_id):
+    return match_resume(resume_id)
+
+@shared_task
+def calculate_resume_matches(job_id):
+    return match_job(job_id)
 
 def extract_experience(doc):
     experience = []
@@ -82,26 +243,64 @@ def calculate_score(skills, experience, education):
     return min(score, 100)
 
 def generate_feedback(resume, skills, experience, education):
+    ResumeFeedback.objects.bulk_create(build_feedback(resume, skills, experience, education))
+
+def build_feedback(resume, skills, experience, education):
+    feedback = []
     if len(skills) < 5:
-        ResumeFeedback.objects.create(
+        feedback.append(ResumeFeedback(
             resume=resume,
             feedback_type='skill_gap',
             message='Your resume has fewer skills than average. Consider adding more relevant skills.',
             severity='medium'
-        )
+        ))
     
     if len(experience) < 2:
-        ResumeFeedback.objects.create(
+        feedback.append(ResumeFeedback(
             resume=resume,
             feedback_type='formatting',
             message='Your experience section could be more detailed. Add specific achievements and responsibilities.',
             severity='high'
-        )
+        ))
     
     if len(education) < 1:
-        ResumeFeedback.objects.create(
+        feedback.append(ResumeFeedback(
             resume=resume,
             feedback_type='ats',
             message='Your education section is missing. Add your educational background.',
             severity='high'
-        ) 
\ No newline at end of file
+        ))
+    return feedback
+
+def schedule_job_rematch(job_id):
+    # Each edit replaces the token, so only the last edit in a burst recomputes
+    window = getattr(settings, 'JOB_REMATCH_DEBOUNCE', 10)
+    token = uuid.uuid4().hex
+    cache.set(f'job_rematch:{job_id}', token, window * 10)
+    recalculate_job_matches.apply_async((job_id, token), countdown=window)
+
+@shared_task
+def recalculate_job_matches(job_id, token=None):
+    if token is not None and cache.get(f'job_rematch:{job_id}') != token:
+        return 0
+    return rematch_job(job_id)
+
+@shared_task
+def notify_application_status(application_ids, status):
+    # One task (and one SMTP connection) for a whole bulk review
+    status_label = dict(JobApplication.STATUS_CHOICES).get(status, status)
+    applications = (
+        JobApplication.objects.filter(id__in=application_ids)
+        .select_related('job', 'applicant')
+        .exclude(applicant__email='')
+    )
+    messages = [
+        (
+            f"Your application for {application.job.title}",
+            f"The status of your application for {application.job.title} is now: {status_label}.",
+            settings.DEFAULT_FROM_EMAIL,
+            [application.applicant.email],
+        )
+        for application in applications.iterator(chunk_size=500)
+    ]
+    return send_mass_mail(messages, fail_silently=True)
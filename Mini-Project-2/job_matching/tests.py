@@ -1,3 +1,613 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from resume_processing.catalog import pipeline_key
+from resume_processing.content_cache import file_hash, pipeline_version, store_result
+from resume_processing.models import Skill
+from resume_processing.nlp import registry
+from .features import build_features, education_level, save_features
+from .matching import engine, match_job, match_resume, rematch_job
+from .models import ANALYSIS_VERSION, Job, JobApplication, JobMatch, Resume, ResumeAnalysis, ResumeFeatures
+from .pagination import MAX_PAGE_SIZE
+from .ranking import ranked_applicants
+from .search import search_jobs
+from .serializers import JobSerializer
+from .tasks import (
+    PIPELINE, analyze_resume, analyze_resumes_batch, claim_analysis, dispatch_resume_analysis, enqueue_resume_analysis,
+    flush_resume_batch,
+)
+from .skill_index import expand_skills
+from .views import (
+    JobApplicationBulkReviewView, JobApplicationExportView, JobApplicationListView, JobDetailView, JobListView,
+)
+
+
+class StopWordsMixin:
+    # Job text is tokenized with the NLTK list; keep tests off the download
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(registry, '_stop_words', frozenset({'a', 'and', 'for', 'in', 'of', 'the'}))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class EducationLevelTests(SimpleTestCase):
+    def test_degrees_in_the_education_section(self):
+        self.assertEqual(education_level([], 'Education\nPh.D. in Chemistry, KBTU'), 4)
+        self.assertEqual(education_level([], 'Education\nMaster of Science in Physics'), 3)
+        self.assertEqual(education_level([], 'Bachelor of Arts, Satbayev University, 2010 - 2014'), 2)
+        self.assertEqual(education_level(['MSc Data Science'], ''), 3)
+
+    def test_degree_words_outside_education_do_not_count(self):
+        text = (
+            'Certifications\nCertified Scrum Master\n'
+            'Experience\nSales associate. Mastered Kubernetes and merged to the Git master branch'
+        )
+        self.assertEqual(education_level([], text), 0)
+
+
+class JobSerializerQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter', password='pass')
+        cls.seeker = User.objects.create_user('seeker', password='pass')
+        cls.resume = Resume.objects.create(user=cls.seeker, title='CV', file='resumes/cv.pdf')
+        for i in range(50):
+            job = Job.objects.create(
+                recruiter=cls.recruiter,
+                title=f'Job {i}',
+                description='Build things',
+                requirements='Python',
+                location='Almaty',
+                job_type='FT',
+                experience_level='MD',
+                skills_required=['python'],
+            )
+            JobApplication.objects.create(job=job, applicant=cls.seeker, resume=cls.resume)
+            JobMatch.objects.create(job=job, resume=cls.resume, match_score=i)
+
+    def serialize_page(self):
+        request = APIRequestFactory().get('/jobs/')
+        request.user = self.seeker
+        jobs = Job.objects.filter(is_active=True).with_listing_data(self.seeker).order_by('id')
+        return JobSerializer(jobs, many=True, context={'request': request}).data
+
+    def test_page_of_jobs_uses_one_query(self):
+        with self.assertNumQueries(1):
+            data = self.serialize_page()
+
+        self.assertEqual(len(data), 50)
+        self.assertEqual(data[0]['applications_count'], 1)
+        self.assertEqual(data[0]['match_score'], 0)
+        self.assertEqual(data[0]['recruiter']['username'], 'recruiter')
+
+
+class JobApplicationListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter', password='pass', is_staff=True)
+        cls.seeker = User.objects.create_user('seeker', password='pass')
+        cls.resume = Resume.objects.create(user=cls.seeker, title='CV', file='resumes/cv.pdf')
+        jobs = Job.objects.bulk_create([
+            Job(
+                recruiter=cls.recruiter,
+                title=f'Job {i}',
+                description='Build things',
+                requirements='Python',
+                location='Almaty',
+                job_type='FT',
+                experience_level='MD',
+                skills_required=['python'],
+            )
+            for i in range(105)
+        ])
+        JobApplication.objects.bulk_create([
+            JobApplication(job=job, applicant=cls.seeker, resume=cls.resume) for job in jobs
+        ])
+        JobMatch.objects.create(job=jobs[-1], resume=cls.resume, match_score=75.0)
+
+    def list(self, user, url='/api/applications/', **params):
+        request = APIRequestFactory().get(url, params)
+        force_authenticate(request, user=user)
+        return JobApplicationListView.as_view()(request).data
+
+    def test_page_with_nested_jobs_uses_two_queries(self):
+        for user in (self.seeker, self.recruiter):
+            with self.assertNumQueries(2):
+                page = self.list(user)
+            self.assertEqual(len(page['results']), 20)
+        newest = self.list(self.seeker)['results'][0]['job']
+        self.assertEqual((newest['title'], newest['match_score'], newest['applications_count']), ('Job 104', 75.0, 1))
+
+    def test_cursor_pages_cover_every_application_once(self):
+        seen = []
+        page = self.list(self.seeker, page_size=40)
+        while True:
+            seen.extend(row['id'] for row in page['results'])
+            if not page['next']:
+                break
+            page = self.list(self.seeker, url=page['next'])
+
+        self.assertEqual(len(seen), 105)
+        self.assertEqual(len(set(seen)), 105)
+
+    def test_page_size_is_capped(self):
+        self.assertEqual(len(self.list(self.seeker, page_size=1000)['results']), MAX_PAGE_SIZE)
+
+
+class JobApplicationExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter', password='pass', is_staff=True)
+        cls.seeker = User.objects.create_user('seeker', password='pass')
+        resume = Resume.objects.create(user=cls.seeker, title='CV', file='resumes/cv.pdf')
+        for i in range(3):
+            job = Job.objects.create(
+                recruiter=cls.recruiter,
+                title=f'Job {i}',
+                description='Build things',
+                requirements='Python',
+                location='Almaty',
+                job_type='FT',
+                experience_level='MD',
+                skills_required=['python'],
+            )
+            JobApplication.objects.create(job=job, applicant=cls.seeker, resume=resume)
+
+    def export(self, user):
+        request = APIRequestFactory().get('/api/applications/export/')
+        force_authenticate(request, user=user)
+        return JobApplicationExportView.as_view()(request)
+
+    def test_streams_the_recruiters_applications_oldest_first(self):
+        response = self.export(self.recruiter)
+
+        self.assertTrue(response.streaming)
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row['job__title'] for row in rows], ['Job 0', 'Job 1', 'Job 2'])
+        self.assertEqual(rows[0]['applicant__username'], 'seeker')
+
+    def test_seekers_cannot_export(self):
+        self.assertEqual(self.export(self.seeker).status_code, 403)
+
+
+@override_settings(ALLOWED_HOSTS=['a.example', 'b.example'])
+class JobFeedCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter', password='pass')
+        cls.seeker = User.objects.create_user('seeker', password='pass')
+        cls.resume = Resume.objects.create(user=cls.seeker, title='CV', file='resumes/cv.pdf')
+        cls.jobs = [
+            Job.objects.create(
+                recruiter=cls.recruiter,
+                title=f'Job {i}',
+                description='Build things',
+                requirements='Python',
+                location='Almaty',
+                job_type='FT',
+                experience_level='MD',
+                skills_required=['python'],
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, host):
+        request = APIRequestFactory().get('/api/jobs/', {'page_size': 2}, HTTP_HOST=host)
+        force_authenticate(request, user=self.seeker)
+        return JobListView.as_view()(request).data
+
+    def test_cursor_links_follow_the_requesting_host(self):
+        first = self.get('a.example')
+        cached = self.get('b.example')
+
+        self.assertTrue(first['next'].startswith('http://a.example/api/jobs/?'))
+        self.assertEqual(cached['next'], first['next'].replace('a.example', 'b.example'))
+
+    def test_cached_page_shows_current_application_counts(self):
+        self.get('a.example')
+        JobApplication.objects.create(job=self.jobs[-1], applicant=self.seeker, resume=self.resume)
+
+        counts = {job['id']: job['applications_count'] for job in self.get('a.example')['results']}
+        self.assertEqual(counts[self.jobs[-1].id], 1)
+
+
+class SkillSynonymTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_synonyms_are_cached_until_the_catalog_changes(self):
+        skill = Skill.objects.create(name='JavaScript', aliases=['js'], category='language')
+        self.assertEqual(expand_skills(['JS']), [{'javascript', 'js'}])
+
+        with self.assertNumQueries(0):
+            expand_skills(['JS'])
+
+        skill.aliases = ['js', 'ecmascript']
+        skill.save()
+        self.assertEqual(expand_skills(['JS']), [{'javascript', 'js', 'ecmascript'}])
+
+
+class JobUpdateRematchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter', password='pass')
+        cls.job = Job.objects.create(
+            recruiter=cls.recruiter,
+            title='Backend developer',
+            description='Build things',
+            requirements='Python',
+            location='Almaty',
+            job_type='FT',
+            experience_level='MD',
+            skills_required=['python'],
+        )
+
+    def patch(self, data):
+        request = APIRequestFactory().patch(f'/api/jobs/{self.job.id}/', data, format='json')
+        force_authenticate(request, user=self.recruiter)
+        with mock.patch('job_matching.views.schedule_job_rematch') as schedule:
+            JobDetailView.as_view()(request, pk=self.job.id)
+        return schedule.called
+
+    def test_edits_to_scored_fields_rematch(self):
+        self.assertTrue(self.patch({'description': 'Build payment APIs'}))
+        self.assertTrue(self.patch({'experience_level': 'SR'}))
+        self.assertTrue(self.patch({'skills_required': ['python', 'go']}))
+
+    def test_other_edits_do_not_rematch(self):
+        self.assertFalse(self.patch({'location': 'Astana'}))
+        self.assertFalse(self.patch({'skills_required': ['Python ']}))
+
+
+class BulkReviewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter', password='pass', is_staff=True)
+        cls.job = Job.objects.create(
+            recruiter=cls.recruiter,
+            title='Backend developer',
+            description='Build things',
+            requirements='Python',
+            location='Almaty',
+            job_type='FT',
+            experience_level='MD',
+            skills_required=['python'],
+        )
+        cls.applications = []
+        for name, status in [('pending', 'P'), ('reviewing', 'R')]:
+            seeker = User.objects.create_user(name, password='pass')
+            resume = Resume.objects.create(user=seeker, title='CV', file='resumes/cv.pdf')
+            cls.applications.append(
+                JobApplication.objects.create(job=cls.job, applicant=seeker, resume=resume, status=status)
+            )
+
+    def test_only_changed_applications_are_notified_after_commit(self):
+        pending, reviewing = self.applications
+        request = APIRequestFactory().post(
+            '/api/applications/bulk-review/', {'ids': [pending.id, reviewing.id, 0], 'status': 'R'}, format='json'
+        )
+        force_authenticate(request, user=self.recruiter)
+
+        with mock.patch('job_matching.views.notify_application_status') as notify:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = JobApplicationBulkReviewView.as_view()(request)
+
+        self.assertEqual(len(callbacks), 1)
+        notify.delay.assert_called_once_with([pending.id], 'R')
+        self.assertEqual(
+            response.data['results'], {pending.id: 'updated', reviewing.id: 'unchanged', 0: 'not_found'}
+        )
+
+
+@override_settings(JOB_MATCH_WEIGHTS={'skills': 1.0, 'text': 0.0, 'experience': 0.0, 'education': 0.0})
+class RankedApplicantsTests(StopWordsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter', password='pass')
+        cls.job = Job.objects.create(
+            recruiter=cls.recruiter,
+            title='Backend developer',
+            description='Build things',
+            requirements='Python',
+            location='Almaty',
+            job_type='FT',
+            experience_level='MD',
+            skills_required=['python', 'go'],
+        )
+
+    def apply(self, name, match_score=None, education=None):
+        seeker = User.objects.create_user(name, password='pass')
+        resume = Resume.objects.create(user=seeker, title='CV', file='resumes/cv.pdf')
+        if education is not None:
+            save_features([build_features(resume.id, {'skills': ['python'], 'experience': [], 'education': []}, education)])
+        return JobApplication.objects.create(job=self.job, applicant=seeker, resume=resume, match_score=match_score)
+
+    def test_sql_top_k_follows_the_requested_tie_breaker_order(self):
+        phd = self.apply('phd', 50.0, 'Education\nPhD in Physics')
+        bachelor = self.apply('bachelor', 50.0, 'Education\nBachelor of Arts')
+        newest = self.apply('newest', 50.0, '')
+
+        def ranked(tie_breakers):
+            return [application.id for application in ranked_applicants(self.job, 2, tie_breakers)]
+
+        self.assertEqual(ranked(['recent', 'education']), [newest.id, bachelor.id])
+        self.assertEqual(ranked(['education', 'recent']), [phd.id, bachelor.id])
+
+        # An unscored application forces the heap merge, which must agree with SQL
+        unscored = self.apply('unscored', None, '')
+        self.assertEqual(ranked(['recent', 'education']), [unscored.id, newest.id])
+        self.assertEqual(ranked(['education', 'recent']), [phd.id, bachelor.id])
+
+    def test_applications_without_features_are_not_rescored(self):
+        self.apply('scored', 40.0, '')
+        pending = self.apply('pending')
+
+        self.assertEqual(len(ranked_applicants(self.job, 5)), 1)
+        with self.assertNumQueries(2):
+            ranked_applicants(self.job, 5)
+        pending.refresh_from_db()
+        self.assertIsNone(pending.match_score)
+
+
+class MatchEngineTests(StopWordsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter', password='pass')
+        cls.job = Job.objects.create(
+            recruiter=cls.recruiter,
+            title='Payments engineer',
+            description='Build payment APIs for the card platform',
+            requirements='Python and PostgreSQL',
+            location='Almaty',
+            job_type='FT',
+            experience_level='SR',
+            skills_required=['python', 'postgresql'],
+        )
+        Job.objects.create(
+            recruiter=cls.recruiter,
+            title='Illustrator',
+            description='Draw covers in watercolor',
+            requirements='A portfolio',
+            location='Almaty',
+            job_type='CT',
+            experience_level='JR',
+            skills_required=['drawing'],
+        )
+
+    def resume(self, name, skills, text, experience=(), education=()):
+        seeker = User.objects.create_user(name, password='pass')
+        resume = Resume.objects.create(user=seeker, title='CV', file='resumes/cv.pdf')
+        result = {'skills': skills, 'experience': list(experience), 'education': list(education)}
+        save_features([build_features(resume.id, result, text, registry.stop_words)])
+        return resume
+
+    def scores(self, resume_ids=None):
+        ids, scores = engine.score_job(self.job, resume_ids)
+        return dict(zip(ids.tolist(), scores.tolist()))
+
+    def test_text_similarity_breaks_skill_ties(self):
+        payments = self.resume('payments', ['python'], 'Built card payment APIs in Python')
+        painter = self.resume('painter', ['python'], 'Painted watercolor covers')
+
+        scores = self.scores()
+        self.assertGreater(scores[payments.id], scores[painter.id])
+
+    def test_experience_and_education_rank_equal_skills(self):
+        senior = self.resume('senior', ['python'], 'Python', ['2012', '2020'], ['Master of Science'])
+        junior = self.resume('junior', ['python'], 'Python', ['2019', '2020'])
+
+        match_job(self.job.id)
+
+        ranked = list(JobMatch.objects.filter(job=self.job).order_by('-match_score').values_list('resume_id', flat=True))
+        self.assertEqual(ranked, [senior.id, junior.id])
+
+    def test_nothing_in_common_scores_zero(self):
+        stranger = self.resume('stranger', ['drawing'], 'Draw covers', ['2000', '2020'], ['PhD in Art'])
+
+        self.assertEqual(self.scores([stranger.id]), {stranger.id: 0.0})
+
+    def test_both_directions_agree(self):
+        resume = self.resume('seeker', ['python', 'postgresql'], 'Payment APIs', ['2015', '2021'])
+
+        job_ids, scores = engine.score_resume(resume.id)
+        self.assertAlmostEqual(dict(zip(job_ids.tolist(), scores.tolist()))[self.job.id], self.scores()[resume.id], places=4)
+
+    def test_job_side_top_k_keeps_rows_resumes_hold(self):
+        payments = self.resume('payments', ['python', 'postgresql'], 'Payment APIs')
+        backend = self.resume('backend', ['python'], 'Services in Python')
+        match_resume(backend.id, k=1)
+
+        match_job(self.job.id, k=1)
+
+        self.assertEqual(
+            set(JobMatch.objects.filter(job=self.job).values_list('resume_id', flat=True)), {payments.id, backend.id}
+        )
+
+    def test_rematch_releases_only_rows_no_top_k_holds(self):
+        payments = self.resume('payments', ['python', 'postgresql'], 'Payment APIs')
+        painter = self.resume('painter', ['drawing'], 'Watercolor covers')
+        backend = self.resume('backend', ['python'], 'Services in Python')
+        match_resume(payments.id, k=1)
+        match_job(self.job.id)
+
+        self.job.skills_required = ['drawing']
+        self.job.save()
+        rematch_job(self.job.id, k=1)
+
+        rows = dict(JobMatch.objects.filter(job=self.job).values_list('resume_id', 'match_score'))
+        self.assertEqual(set(rows), {painter.id, payments.id})
+        self.assertNotIn(backend.id, rows)
+        self.assertEqual(rows[payments.id], self.scores([payments.id])[payments.id])
+
+
+
+class JobSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter', password='pass')
+        cls.seeker = User.objects.create_user('seeker', password='pass')
+
+    def job(self, title, description, requirements):
+        return Job.objects.create(
+            recruiter=self.recruiter,
+            title=title,
+            description=description,
+            requirements=requirements,
+            location='Almaty',
+            job_type='FT',
+            experience_level='MD',
+            skills_required=[],
+        )
+
+    def test_ranked_matches_in_one_query(self):
+        title = self.job('Python developer', 'Build services', 'Django')
+        body = self.job('Backend developer', 'Build services in Python', 'Django')
+        self.job('Designer', 'Draw covers', 'Figma')
+
+        jobs = Job.objects.filter(is_active=True).with_listing_data(self.seeker)
+        with self.assertNumQueries(1):
+            found = list(search_jobs(jobs, 'python'))
+
+        self.assertEqual([job.id for job in found], [title.id, body.id])
+        self.assertGreater(found[0].rank, found[1].rank)
+        self.assertEqual(search_jobs(jobs, 'python').count(), 2)
+
+
+class DispatchAnalysisTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seeker = User.objects.create_user('seeker', password='pass')
+        # No file on disk, so a real analysis run fails
+        self.resume = Resume.objects.create(user=seeker, title='CV', file='resumes/missing.pdf')
+        patcher = mock.patch('job_matching.tasks.analyze_resume.delay')
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_duplicate_dispatch_is_dropped_while_in_flight(self):
+        self.assertTrue(dispatch_resume_analysis(self.resume.id))
+        self.assertFalse(dispatch_resume_analysis(self.resume.id))
+        self.delay.assert_called_once_with(self.resume.id, claimed=True)
+
+    def test_analyzed_resume_is_not_dispatched(self):
+        ResumeAnalysis.objects.create(resume=self.resume, analysis_version=ANALYSIS_VERSION)
+
+        self.assertFalse(dispatch_resume_analysis(self.resume.id))
+        self.delay.assert_not_called()
+
+    def test_failed_run_releases_its_claim(self):
+        dispatch_resume_analysis(self.resume.id)
+        with self.assertLogs('job_matching.tasks', 'ERROR'):
+            self.assertFalse(analyze_resume(self.resume.id, claimed=True))
+
+        self.assertTrue(dispatch_resume_analysis(self.resume.id))
+
+    def test_unclaimed_run_leaves_the_claim_alone(self):
+        dispatch_resume_analysis(self.resume.id)
+        with self.assertLogs('job_matching.tasks', 'ERROR'):
+            analyze_resume(self.resume.id)
+
+        self.assertFalse(dispatch_resume_analysis(self.resume.id))
+
+
+class ResumeBatchTests(StopWordsMixin, TestCase):
+    result = {'skills': ['Python'], 'experience': ['2018', '2021'], 'education': ['KBTU']}
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        media_settings = override_settings(MEDIA_ROOT=media)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.seeker = User.objects.create_user('seeker', password='pass')
+        self.pipeline = pipeline_key(PIPELINE, pipeline_version(ANALYSIS_VERSION))
+
+    def resume(self, content):
+        resume = Resume.objects.create(user=self.seeker, title='CV', file=SimpleUploadedFile('cv.pdf', content))
+        # A cached result keeps the batch off the NLP models
+        store_result(file_hash(resume.file.path), self.pipeline, 'Python developer', [], self.result)
+        return resume
+
+    def run_batch(self, resume_ids, attempt=0):
+        for resume_id in resume_ids:
+            claim_analysis(resume_id)
+        with mock.patch('job_matching.tasks.calculate_job_match') as match, \
+                mock.patch('job_matching.tasks.analyze_resumes_batch.apply_async') as retry:
+            analyze_resumes_batch(resume_ids, attempt=attempt)
+        return match, retry
+
+    def claimed(self, resume_id):
+        return cache.get(f'resume_analysis:inflight:{resume_id}') is not None
+
+    def test_batch_replaces_old_analyses_and_retries_unreadable_files(self):
+        first, second = self.resume(b'first'), self.resume(b'second')
+        ResumeAnalysis.objects.create(resume=first, analysis_version=ANALYSIS_VERSION - 1)
+        missing = Resume.objects.create(user=self.seeker, title='CV', file='resumes/missing.pdf')
+
+        with self.assertLogs('job_matching.tasks', 'ERROR'):
+            match, retry = self.run_batch([first.id, second.id, missing.id])
+
+        analyses = ResumeAnalysis.objects.filter(resume__in=[first, second])
+        self.assertEqual(sorted(analyses.values_list('analysis_version', flat=True)), [ANALYSIS_VERSION] * 2)
+        self.assertEqual(analyses.get(resume=first).skills, ['Python'])
+        self.assertEqual(ResumeFeatures.objects.filter(resume__in=[first, second]).count(), 2)
+        self.assertEqual(sorted(call.args[0] for call in match.delay.call_args_list), [first.id, second.id])
+        retry.assert_called_once()
+        self.assertEqual(retry.call_args.args[0], ([missing.id], None, None, 1))
+        self.assertEqual([self.claimed(i) for i in (first.id, second.id, missing.id)], [False, False, True])
+
+    def test_last_attempt_releases_the_claim(self):
+        missing = Resume.objects.create(user=self.seeker, title='CV', file='resumes/missing.pdf')
+
+        with self.assertLogs('job_matching.tasks', 'ERROR') as logs:
+            _, retry = self.run_batch([missing.id], attempt=3)
+
+        retry.assert_not_called()
+        self.assertFalse(self.claimed(missing.id))
+        self.assertIn('Giving up', logs.output[-1])
+
+
+class ResumeBatchWindowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.seeker = User.objects.create_user('seeker', password='pass')
+        self.resumes = [
+            Resume.objects.create(user=self.seeker, title='CV', file='resumes/cv.pdf') for _ in range(3)
+        ]
+
+    @override_settings(RESUME_BATCH_WINDOW=5)
+    def test_first_upload_in_a_window_schedules_one_flush(self):
+        conn = mock.Mock()
+        conn.set.side_effect = [True, False, False]
+        with mock.patch('job_matching.tasks.get_redis_connection', return_value=conn), \
+                mock.patch('job_matching.tasks.flush_resume_batch.apply_async') as flush:
+            queued = [enqueue_resume_analysis(resume.id) for resume in self.resumes]
+            queued.append(enqueue_resume_analysis(self.resumes[0].id))
+
+        self.assertEqual(queued, [True, True, True, False])
+        self.assertEqual([call.args[1] for call in conn.rpush.call_args_list], [r.id for r in self.resumes])
+        conn.set.assert_called_with('job_matching:pending_resumes:scheduled', 1, nx=True, ex=50)
+        flush.assert_called_once_with(countdown=5)
+
+    @override_settings(RESUME_BATCH_MAX_SIZE=2)
+    def test_flush_splits_unique_ids_into_batches(self):
+        conn = mock.Mock()
+        conn.pipeline.return_value.execute.return_value = ([b'7', b'3', b'7', b'5'], 1, 1)
+        with mock.patch('job_matching.tasks.get_redis_connection', return_value=conn), \
+                mock.patch('job_matching.tasks.analyze_resumes_batch.delay') as batch:
+            self.assertEqual(flush_resume_batch(), 3)
+
+        self.assertEqual([call.args[0] for call in batch.call_args_list], [[3, 5], [7]])
@@ -2,7 +2,11 @@ from django.urls import path
 from .views import (
     JobListView,
     JobDetailView,
+    JobFeedStatsView,
+    RankedApplicantsView,
     JobApplicationListView,
+    JobApplicationExportView,
+    JobApplicationBulkReviewView,
     JobApplicationDetailView,
     ResumeViewSet,
     ResumeDetailView,
@@ -15,8 +19,12 @@ from .views import (
 
 urlpatterns = [
     path('jobs/', JobListView.as_view(), name='job-list'),
+    path('jobs/feed-stats/', JobFeedStatsView.as_view(), name='job-feed-stats'),
     path('jobs/<int:pk>/', JobDetailView.as_view(), name='job-detail'),
+    path('jobs/<int:pk>/ranked-applicants/', RankedApplicantsView.as_view(), name='job-ranked-applicants'),
     path('applications/', JobApplicationListView.as_view(), name='application-list'),
+    path('applications/bulk-review/', JobApplicationBulkReviewView.as_view(), name='application-bulk-review'),
+    path('applications/export/', JobApplicationExportView.as_view(), name='application-export'),
     path('applications/<int:pk>/', JobApplicationDetailView.as_view(), name='application-detail'),
     path('resumes/', ResumeViewSet.as_view(), name='resume-list'),
     path('resumes/<int:pk>/', ResumeDetailView.as_view(), name='resume-detail'),
@@ -1,13 +1,23 @@
+import copy
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework import generics, status, permissions, filters, viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from .models import Job, JobApplication, JobMatch, SavedJob, Resume, ResumeAnalysis, ResumeFeedback
 from .serializers import (
     JobSerializer,
     JobApplicationSerializer,
+    BulkApplicationReviewSerializer,
+    RankedApplicantSerializer,
     JobMatchSerializer,
     SavedJobSerializer,
     JobApplicationCreateSerializer,
@@ -16,26 +26,59 @@ from .serializers import (
     ResumeAnalysisSerializer,
     ResumeFeedbackSerializer
 )
-from .tasks import calculate_job_match, analyze_resume
+from .feed_cache import (
+    absolute_links, feed_stats, get_feed, overlay_application_counts, overlay_match_scores, relative_links, set_feed,
+)
+from .matching import match_inputs
+from .pagination import MAX_PAGE_SIZE, CreatedAtCursorPagination, RelevancePagination
+from .ranking import TIE_BREAKERS, ranked_applicants
+from .search import search_jobs
+from .skill_index import filter_jobs_by_skills
+from .tasks import calculate_resume_matches, dispatch_resume_analysis, enqueue_resume_analysis, notify_application_status, schedule_job_rematch
 
 class JobListView(generics.ListCreateAPIView):
     serializer_class = JobSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['job_type', 'experience_level', 'location']
 
     def get_queryset(self):
-        return Job.objects.filter(is_active=True)
+        if self.request.method == 'GET':
+            # Shared across users; match_score is overlaid per user in list()
+            return Job.objects.filter(is_active=True).with_listing_data()
+        return Job.objects.filter(is_active=True).with_listing_data(self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        payload = get_feed(request.query_params)
+        if payload is None:
+            payload = relative_links(super().list(request, *args, **kwargs).data)
+            set_feed(request.query_params, payload)
+        payload = overlay_application_counts(absolute_links(copy.deepcopy(payload), request))
+        return Response(overlay_match_scores(payload, request.user))
 
     def perform_create(self, serializer):
-        serializer.save(recruiter=self.request.user)
+        job = serializer.save(recruiter=self.request.user)
+        calculate_resume_matches.delay(job.id)
+
+class JobFeedStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(feed_stats())
 
 class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = JobSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Job.objects.filter(is_active=True)
+        return Job.objects.filter(is_active=True).with_listing_data(self.request.user)
+
+    def perform_update(self, serializer):
+        old_inputs = match_inputs(serializer.instance)
+        job = serializer.save()
+        if match_inputs(job) != old_inputs:
+            schedule_job_rematch(job.id)
 
     def perform_destroy(self, instance):
         instance.is_active = False
@@ -44,12 +87,16 @@ class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
 class JobApplicationListView(generics.ListCreateAPIView):
     serializer_class = JobApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         user = self.request.user
+        # Nested jobs carry the listing annotations, one query for the whole page
+        jobs = Prefetch('job', queryset=Job.objects.with_listing_data(user))
+        applications = JobApplication.objects.select_related('applicant').prefetch_related(jobs)
         if user.is_staff:
-            return JobApplication.objects.filter(job__recruiter=user)
-        return JobApplication.objects.filter(applicant=user)
+            return applications.filter(job__recruiter=user)
+        return applications.filter(applicant=user)
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -58,7 +105,65 @@ class JobApplicationListView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         application = serializer.save(applicant=self.request.user)
-        analyze_resume.delay(application.resume.id)
+        dispatch_resume_analysis(application.resume_id)
+
+class JobApplicationBulkReviewView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        serializer = BulkApplicationReviewSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = serializer.validated_data['ids']
+        new_status = serializer.validated_data['status']
+        with transaction.atomic():
+            current = dict(
+                JobApplication.objects.select_for_update()
+                .filter(id__in=ids, job__recruiter=request.user)
+                .values_list('id', 'status')
+            )
+            changed = {app_id for app_id, app_status in current.items() if app_status != new_status}
+            JobApplication.objects.filter(id__in=changed).update(status=new_status, updated_at=timezone.now())
+            if changed:
+                # Registered inside the block so it waits for this transaction's commit
+                notified = sorted(changed)
+                transaction.on_commit(lambda: notify_application_status.delay(notified, new_status))
+
+        results = {}
+        for app_id in ids:
+            if app_id not in current:
+                results[app_id] = 'not_found'
+            elif app_id in changed:
+                results[app_id] = 'updated'
+            else:
+                results[app_id] = 'unchanged'
+        return Response({'status': new_status, 'updated': len(changed), 'results': results})
+
+class JobApplicationExportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return Response({'error': 'Only recruiters can export applications'}, status=status.HTTP_403_FORBIDDEN)
+        applications = (
+            JobApplication.objects.filter(job__recruiter=request.user)
+            .order_by('created_at', 'id')
+            .values(
+                'id', 'job_id', 'job__title', 'applicant_id', 'applicant__username',
+                'resume_id', 'status', 'match_score', 'created_at', 'updated_at'
+            )
+        )
+        response = StreamingHttpResponse(stream_json_array(applications), content_type='application/json')
+        response['Content-Disposition'] = 'attachment; filename="applications.json"'
+        return response
+
+def stream_json_array(queryset, chunk_size=2000):
+    # Emit rows as they are read so memory stays flat for large exports
+    yield '['
+    for index, row in enumerate(queryset.iterator(chunk_size=chunk_size)):
+        yield (',' if index else '') + json.dumps(row, cls=DjangoJSONEncoder)
+    yield ']'
 
 class JobApplicationDetailView(generics.RetrieveUpdateAPIView):
     serializer_class = JobApplicationSerializer
@@ -70,6 +175,22 @@ class JobApplicationDetailView(generics.RetrieveUpdateAPIView):
             return JobApplication.objects.filter(job__recruiter=user)
         return JobApplication.objects.filter(applicant=user)
 
+class RankedApplicantsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, pk):
+        job = get_object_or_404(Job, pk=pk, recruiter=request.user)
+        try:
+            k = min(int(request.query_params.get('k', 20)), MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({'error': 'k must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        tie_breakers = [
+            name for name in request.query_params.get('tie_breakers', 'recent').split(',')
+            if name in TIE_BREAKERS
+        ]
+        applicants = ranked_applicants(job, max(k, 1), tie_breakers)
+        return Response(RankedApplicantSerializer(applicants, many=True).data)
+
 class JobMatchListView(generics.ListAPIView):
     serializer_class = JobMatchSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -103,8 +224,10 @@ class JobSearchView(APIView):
     def post(self, request):
         serializer = JobSearchSerializer(data=request.data)
         if serializer.is_valid():
-            jobs = Job.objects.filter(is_active=True)
-            
+            jobs = Job.objects.filter(is_active=True).with_listing_data(request.user)
+
+            if serializer.validated_data.get('query'):
+                jobs = search_jobs(jobs, serializer.validated_data['query'])
             if serializer.validated_data.get('title'):
                 jobs = jobs.filter(title__icontains=serializer.validated_data['title'])
             if serializer.validated_data.get('location'):
@@ -114,14 +237,24 @@ class JobSearchView(APIView):
             if serializer.validated_data.get('experience_level'):
                 jobs = jobs.filter(experience_level=serializer.validated_data['experience_level'])
             if serializer.validated_data.get('skills'):
-                jobs = jobs.filter(skills_required__contains=serializer.validated_data['skills'])
+                jobs = filter_jobs_by_skills(
+                    jobs,
+                    serializer.validated_data['skills'],
+                    serializer.validated_data['skills_mode']
+                )
             if serializer.validated_data.get('salary_min'):
                 jobs = jobs.filter(salary_min__gte=serializer.validated_data['salary_min'])
             if serializer.validated_data.get('salary_max'):
                 jobs = jobs.filter(salary_max__lte=serializer.validated_data['salary_max'])
 
-            serializer = JobSerializer(jobs, many=True)
-            return Response(serializer.data)
+            # Relevance order has no stable keyset, so ranked results use pages
+            if serializer.validated_data.get('query'):
+                paginator = RelevancePagination()
+            else:
+                paginator = CreatedAtCursorPagination()
+            page = paginator.paginate_queryset(jobs, request, view=self)
+            serializer = JobSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class ResumeViewSet(generics.ListCreateAPIView):
@@ -133,7 +266,7 @@ class ResumeViewSet(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
-        analyze_resume.delay(serializer.instance.id)
+        enqueue_resume_analysis(serializer.instance.id)
 
 class ResumeDetailView(generics.RetrieveDestroyAPIView):
     serializer_class = ResumeSerializer
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from kombu import Queue
 
 # Load environment variables
 load_dotenv()
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -210,3 +212,59 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+
+# Separate queues keep slow NLP work from delaying cheap tasks. Run one
+# worker per queue, e.g.:
+#   celery -A resume_analyzer worker -Q nlp -c 2 --prefetch-multiplier 1
+#   celery -A resume_analyzer worker -Q matching -c 4 --prefetch-multiplier 1
+#   celery -A resume_analyzer worker -Q notifications,default -c 8 --prefetch-multiplier 8
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_QUEUES = (
+    Queue('default'),
+    Queue('nlp'),
+    Queue('matching'),
+    Queue('notifications'),
+)
+CELERY_TASK_ROUTES = {
+    'job_matching.tasks.analyze_resume': {'queue': 'nlp'},
+    'job_matching.tasks.analyze_resumes_batch': {'queue': 'nlp'},
+    'resume_processing.tasks.process_resume': {'queue': 'nlp'},
+    'job_matching.tasks.calculate_job_match': {'queue': 'matching'},
+    'job_matching.tasks.calculate_resume_matches': {'queue': 'matching'},
+    'job_matching.tasks.recalculate_job_matches': {'queue': 'matching'},
+    'job_matching.tasks.notify_application_status': {'queue': 'notifications'},
+}
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv('CELERY_WORKER_PREFETCH_MULTIPLIER', 1))
+
+# NLP settings
+SPACY_MODEL = os.getenv('SPACY_MODEL', 'en_core_web_sm')
+SPACY_DISABLE = [name for name in os.getenv('SPACY_DISABLE', 'tagger,parser,attribute_ruler,lemmatizer').split(',') if name]
+SKILL_CATALOG_CHECK_INTERVAL = int(os.getenv('SKILL_CATALOG_CHECK_INTERVAL', 30))
+NLTK_DATA_DIR = os.getenv('NLTK_DATA_DIR', os.path.join(BASE_DIR, 'nltk_data'))
+NLP_BATCH_SIZE = int(os.getenv('NLP_BATCH_SIZE', 32))
+NLP_N_PROCESS = int(os.getenv('NLP_N_PROCESS', 1))
+RESUME_KEYWORDS_TOP_N = int(os.getenv('RESUME_KEYWORDS_TOP_N', 25))
+RESUME_KEYWORDS_CORPUS_TIMEOUT = int(os.getenv('RESUME_KEYWORDS_CORPUS_TIMEOUT', 60))
+RESUME_BATCH_WINDOW = int(os.getenv('RESUME_BATCH_WINDOW', 5))
+RESUME_BATCH_MAX_SIZE = int(os.getenv('RESUME_BATCH_MAX_SIZE', 100))
+RESUME_BATCH_MAX_RETRIES = int(os.getenv('RESUME_BATCH_MAX_RETRIES', 3))
+RESUME_BATCH_RETRY_DELAY = int(os.getenv('RESUME_BATCH_RETRY_DELAY', 60))
+
+# Resume extraction limits
+RESUME_MAX_BYTES = int(os.getenv('RESUME_MAX_BYTES', 10 * 1024 * 1024))
+RESUME_MAX_PAGES = int(os.getenv('RESUME_MAX_PAGES', 50))
+RESUME_PARALLEL_PAGES = int(os.getenv('RESUME_PARALLEL_PAGES', 20))
+RESUME_EXTRACT_WORKERS = int(os.getenv('RESUME_EXTRACT_WORKERS', 4))
+RESUME_CACHE_TIMEOUT = int(os.getenv('RESUME_CACHE_TIMEOUT', 7 * 24 * 60 * 60))
+
+# Job matching
+JOB_MATCH_TOP_K = int(os.getenv('JOB_MATCH_TOP_K', 50))
+JOB_MATCH_WEIGHTS = {
+    'skills': float(os.getenv('JOB_MATCH_WEIGHT_SKILLS', 0.65)),
+    'text': float(os.getenv('JOB_MATCH_WEIGHT_TEXT', 0.2)),
+    'experience': float(os.getenv('JOB_MATCH_WEIGHT_EXPERIENCE', 0.1)),
+    'education': float(os.getenv('JOB_MATCH_WEIGHT_EDUCATION', 0.05)),
+}
+JOB_FEED_CACHE_TIMEOUT = int(os.getenv('JOB_FEED_CACHE_TIMEOUT', 300))
+JOB_REMATCH_DEBOUNCE = int(os.getenv('JOB_REMATCH_DEBOUNCE', 10))
+RESUME_ANALYSIS_LOCK_TIMEOUT = int(os.getenv('RESUME_ANALYSIS_LOCK_TIMEOUT', 600))
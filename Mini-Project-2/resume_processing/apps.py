@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ResumeProcessingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'resume_processing'
+
+    def ready(self):
+        from . import signals  # noqa: F401
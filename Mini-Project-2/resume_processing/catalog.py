@@ -0,0 +1,39 @@
+import time
+
+from django.core.cache import cache
+
+from .models import Skill
+
+CATALOG_VERSION_KEY = 'skill_catalog:version'
+
+
+def version_seed():
+    # Bumps are cache round trips, far slower than one per microsecond, so a
+    # version lost to eviction restarts above every value handed out before it
+    return time.time_ns() // 1000
+
+
+def catalog_version():
+    return cache.get_or_set(CATALOG_VERSION_KEY, version_seed, None)
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, version_seed(), None)
+
+
+def pipeline_key(pipeline, version):
+    # Cached results only hold for the code, model and catalog that produced them
+    return f'{pipeline}@{version}:catalog-{catalog_version()}'
+
+
+def pipeline_name(key):
+    return key.partition('@')[0]
+
+
+def catalog_terms():
+    for name, aliases in Skill.objects.values_list('name', 'aliases').iterator(chunk_size=2000):
+        terms = {name, *(alias for alias in aliases or [] if isinstance(alias, str))}
+        yield name, sorted(term.strip() for term in terms if term and term.strip())
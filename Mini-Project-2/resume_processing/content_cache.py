@@ -0,0 +1,86 @@
+import hashlib
+from importlib import metadata
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .catalog import pipeline_name
+from .models import ResumeContentCache
+
+CACHE_PREFIX = 'resume_content'
+
+
+def file_hash(file_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_version():
+    model = getattr(settings, 'SPACY_MODEL', 'en_core_web_sm')
+    disabled = ','.join(sorted(getattr(settings, 'SPACY_DISABLE', [])))
+    try:
+        version = metadata.version(model)
+    except metadata.PackageNotFoundError:
+        version = 'unversioned'
+    return f'{model}-{version}-{disabled}'
+
+
+def pipeline_version(version):
+    # Results hold for one pipeline version run with one model build
+    return f'v{version}-{model_version()}'
+
+
+def cache_key(content_hash):
+    return f'{CACHE_PREFIX}:{content_hash}'
+
+
+def get_entry(content_hash):
+    """Return ``{'text', 'entities', 'results'}`` for a file, or None.
+
+    Redis is checked first; the database table backs it when a key has
+    been evicted, and a hit there re-warms Redis.
+    """
+    entry = cache.get(cache_key(content_hash))
+    if entry is not None:
+        return entry
+    entry = (
+        ResumeContentCache.objects
+        .filter(content_hash=content_hash)
+        .values('text', 'entities', 'results')
+        .first()
+    )
+    if entry is not None:
+        cache.set(cache_key(content_hash), entry, getattr(settings, 'RESUME_CACHE_TIMEOUT', None))
+    return entry
+
+
+def get_result(entry, pipeline):
+    if entry is None:
+        return None
+    return entry['results'].get(pipeline)
+
+
+def store_result(content_hash, pipeline, text, entities, result):
+    with transaction.atomic():
+        row, _ = ResumeContentCache.objects.select_for_update().get_or_create(content_hash=content_hash)
+        row.text = text
+        row.entities = entities
+        # One result per pipeline: entries for older code or catalog versions can never hit again
+        name = pipeline_name(pipeline)
+        row.results = {
+            key: value for key, value in row.results.items()
+            if '@' in key and pipeline_name(key) != name
+        }
+        row.results[pipeline] = result
+        row.save()
+    entry = {'text': row.text, 'entities': row.entities, 'results': row.results}
+    cache.set(cache_key(content_hash), entry, getattr(settings, 'RESUME_CACHE_TIMEOUT', None))
+    return entry
+
+
+def doc_entities(doc):
+    return [[ent.text, ent.label_] for ent in doc.ents]
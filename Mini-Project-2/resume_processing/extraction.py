@@ -0,0 +1,108 @@
+import logging
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import PyPDF2
+import docx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+ExtractionResult = namedtuple('ExtractionResult', ['text', 'pages', 'page_timings', 'truncated'])
+
+
+def get_file_type(file_path):
+    return os.path.splitext(file_path)[1].lstrip('.').lower()
+
+
+def iter_pdf_pages(file_path, start=0, stop=None, timings=None):
+    # Yield page text lazily so callers join once instead of growing a string
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        for page in islice(reader.pages, start, stop):
+            started = time.perf_counter()
+            text = page.extract_text() or ''
+            if timings is not None:
+                timings.append(time.perf_counter() - started)
+            yield text
+
+
+def iter_docx_paragraphs(file_path, max_paragraphs=None):
+    doc = docx.Document(file_path)
+    for paragraph in islice(doc.paragraphs, max_paragraphs):
+        yield paragraph.text
+
+
+def _extract_page_range(file_path, start, stop):
+    timings = []
+    pages = list(iter_pdf_pages(file_path, start, stop, timings))
+    return pages, timings
+
+
+def _count_pdf_pages(file_path):
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def _extract_pdf_parallel(file_path, page_count, workers):
+    chunk = -(-page_count // workers)
+    ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+    pages = []
+    timings = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_extract_page_range, file_path, start, stop) for start, stop in ranges]
+        for future in futures:
+            chunk_pages, chunk_timings = future.result()
+            pages.extend(chunk_pages)
+            timings.extend(chunk_timings)
+    return pages, timings
+
+
+def extract_pdf(file_path, max_pages=None):
+    max_pages = max_pages or getattr(settings, 'RESUME_MAX_PAGES', 50)
+    page_count = _count_pdf_pages(file_path)
+    truncated = page_count > max_pages
+    page_count = min(page_count, max_pages)
+
+    workers = getattr(settings, 'RESUME_EXTRACT_WORKERS', 4)
+    if workers > 1 and page_count >= getattr(settings, 'RESUME_PARALLEL_PAGES', 20):
+        try:
+            pages, timings = _extract_pdf_parallel(file_path, page_count, workers)
+            return pages, timings, truncated
+        except (AssertionError, OSError) as e:
+            # Daemonic Celery workers cannot fork a pool; fall back to one process
+            logger.warning("Parallel PDF extraction unavailable: %s", e)
+
+    timings = []
+    pages = list(iter_pdf_pages(file_path, 0, page_count, timings))
+    return pages, timings, truncated
+
+
+def extract_document(file_path, file_type=None):
+    file_type = file_type or get_file_type(file_path)
+    max_bytes = getattr(settings, 'RESUME_MAX_BYTES', 10 * 1024 * 1024)
+    if os.path.getsize(file_path) > max_bytes:
+        raise ValueError(f"Resume file exceeds {max_bytes} bytes")
+
+    if file_type == 'pdf':
+        pages, timings, truncated = extract_pdf(file_path)
+        text = '\n'.join(pages)
+    elif file_type == 'docx':
+        pages, timings, truncated = [], [], False
+        text = '\n'.join(iter_docx_paragraphs(file_path))
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+    if timings:
+        logger.debug(
+            "Extracted %d pages from %s in %.3fs (slowest page %.3fs)",
+            len(timings), file_path, sum(timings), max(timings),
+        )
+    return ExtractionResult(text, len(pages), timings, truncated)
+
+
+def extract_text_from_file(file_path, file_type=None):
+    return extract_document(file_path, file_type).text
@@ -0,0 +1,95 @@
+import heapq
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import KeywordDocument, TermDocumentFrequency
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+MAX_TERM_LENGTH = 64
+CORPUS_SIZE_KEY = 'resume_keywords:corpus_size'
+
+
+def term_counts(text, stop_words=frozenset()):
+    return Counter(
+        token
+        for token in TOKEN_RE.findall(text.lower())
+        if token not in stop_words and len(token) <= MAX_TERM_LENGTH and not token.isdigit()
+    )
+
+
+def record_document(resume_id, terms):
+    """Count one resume's distinct terms in the document-frequency table.
+
+    The terms each resume contributed are kept, so a redelivered task
+    changes nothing and reprocessing only moves the difference.
+    """
+    terms = set(terms)
+    with transaction.atomic():
+        document, _ = KeywordDocument.objects.select_for_update().get_or_create(resume_id=resume_id)
+        previous = set(document.terms)
+        added, removed = sorted(terms - previous), sorted(previous - terms)
+        if not added and not removed:
+            return False
+        # Insert and lock rows in term order so concurrent workers cannot deadlock
+        TermDocumentFrequency.objects.bulk_create(
+            [TermDocumentFrequency(term=term) for term in added],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        list(
+            TermDocumentFrequency.objects.select_for_update()
+            .filter(term__in=added + removed)
+            .order_by('term')
+            .values_list('id', flat=True)
+        )
+        now = timezone.now()
+        TermDocumentFrequency.objects.filter(term__in=added).update(
+            document_count=F('document_count') + 1, updated_at=now
+        )
+        TermDocumentFrequency.objects.filter(term__in=removed, document_count__gt=0).update(
+            document_count=F('document_count') - 1, updated_at=now
+        )
+        document.terms = sorted(terms)
+        document.save(update_fields=['terms', 'updated_at'])
+    return True
+
+
+def corpus_size():
+    # Counted rather than kept in a shared row every worker would have to lock
+    timeout = getattr(settings, 'RESUME_KEYWORDS_CORPUS_TIMEOUT', 60)
+    return cache.get_or_set(CORPUS_SIZE_KEY, KeywordDocument.objects.count, timeout)
+
+
+def document_frequencies(terms):
+    frequencies = dict(
+        TermDocumentFrequency.objects.filter(term__in=list(terms)).values_list('term', 'document_count')
+    )
+    # The cached corpus size can lag the table; it is never smaller than a term's count
+    return max(corpus_size(), *frequencies.values(), 0), frequencies
+
+
+def top_keywords(counts, documents, frequencies, n):
+    def weight(term):
+        # Sublinear tf times smoothed idf, as in job_matching.features
+        idf = math.log((1 + documents) / (1 + frequencies.get(term, 0))) + 1
+        return (1 + math.log(counts[term])) * idf
+
+    return heapq.nlargest(n, counts, key=lambda term: (weight(term), term))
+
+
+def extract_keywords(text, stop_words=frozenset(), n=None, resume_id=None):
+    n = n or getattr(settings, 'RESUME_KEYWORDS_TOP_N', 25)
+    counts = term_counts(text, stop_words)
+    if not counts:
+        return []
+    if resume_id is not None:
+        record_document(resume_id, counts)
+    documents, frequencies = document_frequencies(counts)
+    return top_keywords(counts, documents, frequencies, n)
@@ -0,0 +1,92 @@
+import os
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from resume_processing.extraction import extract_text_from_file
+from resume_processing.sections import classify_sentences
+
+SENTENCE_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+
+SAMPLE_LINES = [
+    'Worked as a backend developer at Kaspi building payment services.',
+    'Five years of experience with Python, Django and PostgreSQL.',
+    'Held the position of team lead for a group of six engineers.',
+    'Bachelor degree in Computer Science, Nazarbayev University, 2016.',
+    'Graduated from Almaty College of Communications with honours.',
+    'Education: Master of Science in Data Analytics.',
+    'Built a recommendation pipeline that served two million users.',
+    'Fluent in English, Russian and Kazakh.',
+    'Volunteered as a mentor at local coding bootcamps.',
+    'Interests include chess, hiking and open source software.',
+]
+
+
+def legacy_classify(sentences):
+    # The two passes process_resume used to make
+    experience = []
+    for text in sentences:
+        if any(word in text.lower() for word in ['experience', 'worked', 'job', 'position']):
+            experience.append(text)
+    education = []
+    for text in sentences:
+        if any(word in text.lower() for word in ['education', 'degree', 'university', 'college']):
+            education.append(text)
+    return {'experience': experience, 'education': education}
+
+
+def load_corpus(path):
+    texts = []
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if name.endswith('.txt'):
+            with open(file_path, encoding='utf-8', errors='ignore') as file:
+                texts.append(file.read())
+        elif name.endswith(('.pdf', '.docx')):
+            texts.append(extract_text_from_file(file_path))
+    return texts
+
+
+def synthetic_corpus(count, lines, seed=0):
+    rng = random.Random(seed)
+    return ['\n'.join(rng.choices(SAMPLE_LINES, k=lines)) for _ in range(count)]
+
+
+def time_runs(func, documents, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for sentences in documents:
+            func(sentences)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+class Command(BaseCommand):
+    help = 'Compare the single-pass section classifier with the old per-section loops'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', help='Directory of sample CVs (.txt, .pdf, .docx)')
+        parser.add_argument('--count', type=int, default=500, help='Synthetic CVs when no corpus is given')
+        parser.add_argument('--lines', type=int, default=80)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options['corpus']:
+            texts = load_corpus(options['corpus'])
+        else:
+            texts = synthetic_corpus(options['count'], options['lines'])
+        documents = [[s for s in SENTENCE_RE.split(text) if s.strip()] for text in texts]
+        sentences = sum(len(document) for document in documents)
+
+        legacy = time_runs(legacy_classify, documents, options['repeat'])
+        single = time_runs(classify_sentences, documents, options['repeat'])
+        self.stdout.write(f'{len(documents)} CVs, {sentences} sentences (best of {options["repeat"]})')
+        for label, seconds in (('two-pass any()', legacy), ('single-pass regex', single)):
+            self.stdout.write(
+                f'{label:>18}: {seconds * 1000:.1f}ms total, '
+                f'{seconds / max(len(documents), 1) * 1e6:.1f}us per CV'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {legacy / single:.2f}x'))
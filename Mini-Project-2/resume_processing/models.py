@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 from user_management.models import User
 
 class Resume(models.Model):
@@ -34,8 +35,64 @@ class ResumeAnalysis(models.Model):
     def __str__(self):
         return f"Analysis for {self.resume}"
 
+class ProcessingRun(models.Model):
+    class Status(models.TextChoices):
+        RUNNING = 'R', _('Running')
+        COMPLETED = 'C', _('Completed')
+        FAILED = 'F', _('Failed')
+
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='processing_runs')
+    status = models.CharField(max_length=1, choices=Status.choices, default=Status.RUNNING)
+    cache_hit = models.BooleanField(default=False)
+    # Seconds spent in each stage, e.g. {"extract": 0.41, "nlp": 1.2}
+    stage_timings = models.JSONField(default=dict)
+    # Cold model load vs. inference seconds for the NLP part of the run
+    model_load_time = models.FloatField(null=True, blank=True)
+    inference_time = models.FloatField(null=True, blank=True)
+    duration = models.FloatField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"Processing run for {self.resume} ({self.get_status_display()})"
+
+class ResumeContentCache(models.Model):
+    # Extraction and NLP results keyed by the SHA-256 of the uploaded file
+    content_hash = models.CharField(max_length=64, unique=True)
+    text = models.TextField(blank=True)
+    entities = models.JSONField(default=list)
+    results = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Cached content {self.content_hash[:12]}"
+
+class TermDocumentFrequency(models.Model):
+    # Resumes containing each keyword term, used as the idf side of keyword weights
+    term = models.CharField(max_length=64, unique=True)
+    document_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.term}: {self.document_count}"
+
+class KeywordDocument(models.Model):
+    # Terms a resume added to TermDocumentFrequency, so each resume is counted once
+    resume = models.OneToOneField(Resume, on_delete=models.CASCADE, primary_key=True, related_name='keyword_document')
+    terms = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Keyword terms for {self.resume}"
+
 class Skill(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    aliases = models.JSONField(default=list, blank=True)
     category = models.CharField(max_length=50)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -51,6 +108,8 @@ class Experience(models.Model):
     start_date = models.DateField()
     end_date = models.DateField(null=True, blank=True)
     description = models.TextField(blank=True)
+    # Set on rows parsed from the resume file, which reprocessing replaces
+    extracted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -65,6 +124,7 @@ class Education(models.Model):
     start_date = models.DateField()
     end_date = models.DateField(null=True, blank=True)
     description = models.TextField(blank=True)
+    extracted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
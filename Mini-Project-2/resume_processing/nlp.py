@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+
+import nltk
+import spacy
+from celery.signals import worker_process_init
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+NLTK_CORPORA = {
+    'stopwords': 'corpora/stopwords',
+}
+
+
+class ModelRegistry:
+    """Process-wide holder for the spaCy pipeline and NLTK data.
+
+    Models are loaded once per worker process (on ``worker_process_init``)
+    and shared by every task running in that process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nlp = None
+        self._stop_words = None
+        self.load_time = 0.0
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            self.load()
+        return self._nlp
+
+    @property
+    def stop_words(self):
+        # Loaded without spaCy so the match engine can tokenize job text too
+        if self._stop_words is None:
+            with self._lock:
+                self._load_stop_words()
+        return self._stop_words
+
+    def _load_stop_words(self):
+        if self._stop_words is None:
+            load_nltk_data()
+            from nltk.corpus import stopwords
+            self._stop_words = frozenset(stopwords.words('english'))
+
+    def load(self):
+        with self._lock:
+            if self._nlp is not None:
+                return
+            started = time.perf_counter()
+            self._load_stop_words()
+            self._nlp = load_pipeline()
+            self.load_time = time.perf_counter() - started
+            logger.info("Loaded NLP models in %.3fs", self.load_time)
+
+    @property
+    def loaded(self):
+        return self._nlp is not None
+
+
+def load_nltk_data():
+    # Prefer the bundled data dir and only download what is actually missing
+    data_dir = getattr(settings, 'NLTK_DATA_DIR', None)
+    if data_dir and data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+    for package, resource in NLTK_CORPORA.items():
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            nltk.download(package, download_dir=data_dir, quiet=True)
+
+
+def load_pipeline():
+    # Skills come from the phrase matcher, so tagging, parsing and lemmas are unused
+    nlp = spacy.load(
+        getattr(settings, 'SPACY_MODEL', 'en_core_web_sm'),
+        disable=getattr(settings, 'SPACY_DISABLE', ['tagger', 'parser', 'attribute_ruler', 'lemmatizer']),
+    )
+    # The statistical sentence splitter is far cheaper than the parser
+    if 'parser' not in nlp.pipe_names and 'senter' in nlp.disabled:
+        nlp.enable_pipe('senter')
+    return nlp
+
+
+registry = ModelRegistry()
+
+
+class track_inference:
+    """Time a task body and attribute any cold model load separately.
+
+    Callers store ``load_seconds`` and ``inference_seconds`` with the task,
+    e.g. on its ProcessingRun.
+    """
+
+    def __enter__(self):
+        was_loaded = registry.loaded
+        started = time.perf_counter()
+        self.nlp = registry.nlp
+        self.load_seconds = 0.0 if was_loaded else time.perf_counter() - started
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.inference_seconds = time.perf_counter() - self.started
+        logger.info(
+            "NLP task timings: load=%.3fs inference=%.3fs",
+            self.load_seconds, self.inference_seconds,
+        )
+        return False
+
+
+@worker_process_init.connect
+def warm_models(**kwargs):
+    registry.load()
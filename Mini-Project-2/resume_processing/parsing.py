@@ -0,0 +1,148 @@
+import re
+from datetime import date
+
+from .models import Education, Experience
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+MONTH_NAME = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+
+
+def date_pattern(prefix):
+    return (
+        rf'(?:(?P<{prefix}_name>{MONTH_NAME})\s+|(?P<{prefix}_num>0?[1-9]|1[0-2])[/.])?'
+        rf'(?P<{prefix}_year>(?:19|20)\d\d)'
+    )
+
+
+# "Jan 2018 - Mar 2021", "05/2019 to 06/2020", "2016 - present"
+DATE_RANGE_RE = re.compile(
+    rf"{date_pattern('start')}\s*(?:-|–|—|to|until)\s*"
+    rf"(?:{date_pattern('end')}|(?P<ongoing>present|current|now|today))",
+    re.IGNORECASE,
+)
+POSITION_AT_RE = re.compile(r'^(?P<position>.+?)\s+(?:at|@)\s+(?P<company>.+)$', re.IGNORECASE)
+LABEL_SPLIT_RE = re.compile(r'\s*(?:,|\||\s-\s|\s–\s|\s—\s)\s*')
+DEGREE_RE = re.compile(
+    r"\b(?:ph\.?d|doctor(?:ate)?|master(?:'s)?|m\.?sc|mba|m\.?a\.?|bachelor(?:'s)?|b\.?sc|b\.?a\.?|"
+    r"associate(?:'s)?|diploma)\b[^,|]*",
+    re.IGNORECASE,
+)
+FIELD_RE = re.compile(r'\b(?:in|of)\s+(?P<field>[A-Z][\w&]*(?:\s+(?:and\s+)?[A-Z][\w&]*)*)')
+INSTITUTION_RE = re.compile(
+    r"[^,|]*\b(?:university|college|institute|school|academy)\b[^,|]*", re.IGNORECASE
+)
+CLAUSE_END_RE = re.compile(r'[.;!?]\s+(?=[A-Z])')
+STRIP_CHARS = ' .,;:|()-–—'
+MAX_LENGTH = 100
+
+
+def parse_date(match, prefix, default_month):
+    year = int(match.group(f'{prefix}_year'))
+    name = match.group(f'{prefix}_name')
+    number = match.group(f'{prefix}_num')
+    if name:
+        month = MONTHS[name[:3].lower()]
+    elif number:
+        month = int(number)
+    else:
+        month = default_month
+    return date(year, month, 1)
+
+
+def first_clause(text):
+    return CLAUSE_END_RE.split(text, maxsplit=1)[0].strip(STRIP_CHARS)
+
+
+def dated_entries(sentences):
+    """Yield ``(label, start_date, end_date, text)`` for each date range.
+
+    The label is the text between the previous range and this one, so
+    "Developer at A, 2018 - 2020; Lead at B, 2020 - present" gives two
+    entries. When the dates come first the label is the clause after them,
+    and when they stand on a line of their own it is the previous line.
+    ``end_date`` is None for ongoing entries.
+    """
+    seen = set()
+    for text in sentences:
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        for i, line in enumerate(lines):
+            matches = list(DATE_RANGE_RE.finditer(line))
+            position = 0
+            for j, match in enumerate(matches):
+                label = line[position:match.start()].strip(STRIP_CHARS)
+                position = match.end()
+                if not label:
+                    following = matches[j + 1].start() if j + 1 < len(matches) else len(line)
+                    label = first_clause(line[position:following])
+                    if label:
+                        position = following
+                if not label and i > 0 and not matches[:j]:
+                    label = lines[i - 1].strip(STRIP_CHARS)
+
+                start = parse_date(match, 'start', 1)
+                end = None if match.group('ongoing') else parse_date(match, 'end', 12)
+                if not label or (end is not None and end < start):
+                    continue
+                key = (label.lower(), start, end)
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield label, start, end, text
+
+
+def clip(value):
+    return ' '.join(value.split())[:MAX_LENGTH]
+
+
+def parse_experience(resume, sentences):
+    experiences = []
+    for label, start, end, text in dated_entries(sentences):
+        if DEGREE_RE.search(label):
+            # A sentence can sit in both sections; degrees belong to education
+            continue
+        match = POSITION_AT_RE.match(label)
+        if match:
+            position, company = match.group('position'), match.group('company')
+        else:
+            parts = LABEL_SPLIT_RE.split(label, maxsplit=1) + ['']
+            position, company = parts[0], parts[1]
+        experiences.append(Experience(
+            resume=resume,
+            company=clip(company),
+            position=clip(position),
+            start_date=start,
+            end_date=end,
+            description=text,
+            extracted=True,
+        ))
+    return experiences
+
+
+def parse_education(resume, sentences):
+    educations = []
+    for label, start, end, text in dated_entries(sentences):
+        degree = DEGREE_RE.search(label)
+        degree = degree.group(0) if degree else ''
+        # The last "in"/"of" names the field: "Bachelor of Science in Physics"
+        fields = list(FIELD_RE.finditer(degree))
+        field = fields[-1] if fields else None
+        if field:
+            degree, field = degree[:field.start()], field.group('field')
+        institution = INSTITUTION_RE.search(label)
+        if not degree and (institution is None or POSITION_AT_RE.match(label)):
+            # Jobs such as "Lecturer at Satbayev University" stay in experience
+            continue
+        educations.append(Education(
+            resume=resume,
+            institution=clip(institution.group(0) if institution else ''),
+            degree=clip(degree),
+            field_of_study=clip(field or ''),
+            start_date=start,
+            end_date=end,
+            description=text,
+            extracted=True,
+        ))
+    return educations
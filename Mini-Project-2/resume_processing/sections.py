@@ -0,0 +1,68 @@
+import re
+
+# Add a bucket here and classify_sentences fills it in the same pass
+SECTION_KEYWORDS = {
+    'experience': ('experience', 'worked', 'job', 'position'),
+    'education': ('education', 'degree', 'university', 'college'),
+}
+
+# Whole lines that open a section. Lines under a heading belong to it until
+# the next heading, whatever words they use; 'other' headings close it.
+SECTION_HEADINGS = {
+    'experience': (
+        r'(?:(?:work|working|professional|relevant|employment|career)\s+)?(?:experience|history)'
+        r'|employment|work|career'
+    ),
+    'education': r'education(?:\s+and\s+training)?|academic\s+background|qualifications',
+    'other': (
+        r'(?:technical\s+|key\s+|core\s+)?skills|projects|summary|profile|objective|about\s+me'
+        r'|certifications?|courses|languages|interests|hobbies|references|contacts?'
+        r'|awards|achievements|publications|volunteering'
+    ),
+}
+HEADING_STRIP = ' \t:-–—•*#'
+MAX_HEADING_LENGTH = 40
+
+
+def compile_sections(keywords):
+    # Plain alternations over lowercase text let the regex engine scan for
+    # literals; IGNORECASE or \b anchors make it several times slower
+    return [
+        (name, re.compile('|'.join(map(re.escape, words))))
+        for name, words in keywords.items()
+    ]
+
+
+def compile_headings(headings):
+    return re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in headings.items()))
+
+
+SECTION_PATTERNS = compile_sections(SECTION_KEYWORDS)
+HEADING_RE = compile_headings(SECTION_HEADINGS)
+
+
+def classify_sentences(sentences, patterns=SECTION_PATTERNS, headings=HEADING_RE):
+    """Sort sentences into section buckets in a single pass.
+
+    Each sentence is lowercased once and lands in every bucket whose
+    keywords it mentions, plus the bucket of the heading it appears under.
+    """
+    buckets = {name: [] for name, _ in patterns}
+    current = None
+    for text in sentences:
+        lowered = text.lower()
+        under = None
+        for line in lowered.split('\n') if '\n' in lowered else (lowered,):
+            match = headings.fullmatch(line.strip(HEADING_STRIP)) if len(line) <= MAX_HEADING_LENGTH else None
+            if match is not None:
+                current = match.lastgroup if match.lastgroup in buckets else None
+            elif current is not None and under is None and line.strip():
+                under = current
+        for name, pattern in patterns:
+            if name == under or pattern.search(lowered):
+                buckets[name].append(text)
+    return buckets
+
+
+def classify_doc(doc, patterns=SECTION_PATTERNS, headings=HEADING_RE):
+    return classify_sentences((sent.text for sent in doc.sents), patterns, headings)
@@ -1,5 +1,6 @@
+from django.core.cache import cache
 from rest_framework import serializers
-from .models import Resume, ResumeAnalysis, Skill, Experience, Education
+from .models import Resume, ResumeAnalysis, ProcessingRun, Skill, Experience, Education
 from user_management.serializers import UserSerializer
 
 class SkillSerializer(serializers.ModelSerializer):
@@ -12,13 +13,13 @@ class ExperienceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Experience
         fields = '__all__'
-        read_only_fields = ('created_at', 'updated_at')
+        read_only_fields = ('created_at', 'updated_at', 'extracted')
 
 class EducationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Education
         fields = '__all__'
-        read_only_fields = ('created_at', 'updated_at')
+        read_only_fields = ('created_at', 'updated_at', 'extracted')
 
 class ResumeAnalysisSerializer(serializers.ModelSerializer):
     skills = SkillSerializer(many=True, read_only=True)
@@ -41,6 +42,20 @@ class ResumeSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('created_at', 'updated_at', 'status')
 
+class ProcessingRunSerializer(serializers.ModelSerializer):
+    current_stage = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProcessingRun
+        fields = ('id', 'resume', 'status', 'current_stage', 'cache_hit', 'stage_timings',
+                  'model_load_time', 'inference_time', 'duration', 'error', 'started_at', 'finished_at')
+        read_only_fields = fields
+
+    def get_current_stage(self, obj):
+        if obj.status != ProcessingRun.Status.RUNNING:
+            return None
+        return cache.get(f'processing_run:{obj.id}:stage')
+
 class ResumeUploadSerializer(serializers.ModelSerializer):
     file = serializers.FileField()
 
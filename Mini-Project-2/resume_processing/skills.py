@@ -0,0 +1,61 @@
+import threading
+import time
+
+from django.conf import settings
+from spacy.matcher import PhraseMatcher
+from spacy.util import filter_spans
+
+from .catalog import catalog_terms, catalog_version
+from .nlp import registry
+
+
+class SkillMatcher:
+    """PhraseMatcher over the Skill catalog, compiled once per process.
+
+    The catalog version in the cache is polled at most every
+    ``SKILL_CATALOG_CHECK_INTERVAL`` seconds and the matcher is rebuilt
+    when it changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.matcher = None
+        self.version = None
+        self.checked_at = 0.0
+        self.build_time = 0.0
+
+    def get(self):
+        interval = getattr(settings, 'SKILL_CATALOG_CHECK_INTERVAL', 30)
+        now = time.monotonic()
+        if self.matcher is not None and now - self.checked_at < interval:
+            return self.matcher
+        version = catalog_version()
+        with self._lock:
+            if self.matcher is None or version != self.version:
+                self.matcher = self.build()
+                self.version = version
+            self.checked_at = now
+            return self.matcher
+
+    def build(self):
+        started = time.perf_counter()
+        nlp = registry.nlp
+        # Match on lowercase text so patterns only need the tokenizer
+        matcher = PhraseMatcher(nlp.vocab, attr='LOWER')
+        for name, terms in catalog_terms():
+            if terms:
+                matcher.add(name, list(nlp.tokenizer.pipe(terms)))
+        self.build_time = time.perf_counter() - started
+        return matcher
+
+    def extract(self, doc):
+        # Longest match wins where aliases overlap, e.g. "machine learning" over "learning"
+        spans = filter_spans(self.get()(doc, as_spans=True))
+        return list(dict.fromkeys(span.label_ for span in spans))
+
+
+skill_matcher = SkillMatcher()
+
+
+def extract_skills(doc):
+    return skill_matcher.extract(doc)
@@ -1,106 +1,127 @@
+import time
+from contextlib import contextmanager
+
 from celery import shared_task
 from django.conf import settings
-from .models import Resume, ResumeAnalysis, Skill, Experience, Education
-import PyPDF2
-import docx
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-import spacy
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from .models import Resume, ResumeAnalysis, ProcessingRun, Skill, Experience, Education
+from .content_cache import doc_entities, file_hash, get_entry, get_result, pipeline_version, store_result
+from .extraction import extract_text_from_file
+from .keywords import extract_keywords
+from .nlp import registry, track_inference
+from .parsing import parse_education, parse_experience
+from .sections import classify_doc
+from .catalog import pipeline_key
+from .skills import extract_skills
 import json
 
-# Download required NLTK data
-nltk.download('punkt')
-nltk.download('stopwords')
-
-# Load spaCy model
-nlp = spacy.load('en_core_web_sm')
-
-@shared_task
+PIPELINE = 'resume_processing'
+# Bump when a change to keywords, sections, skills or the NLP setup changes
+# what a cached result holds, or reprocessing gets the old result back
+PIPELINE_VERSION = 1
+
+class StageTimer:
+    """Accumulates per-stage durations and publishes the current stage."""
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.timings = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        # Progress goes to the cache so stages cost no extra DB writes
+        cache.set(stage_key(self.run_id), name, 60 * 60)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(self.timings.get(name, 0.0) + time.perf_counter() - started, 6)
+
+    @property
+    def duration(self):
+        return time.perf_counter() - self.started
+
+def stage_key(run_id):
+    return f'processing_run:{run_id}:stage'
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
 def process_resume(resume_id):
-    try:
-        resume = Resume.objects.get(id=resume_id)
-        resume.status = Resume.Status.PROCESSING
-        resume.save()
-
-        # Extract text from resume file
-        text = extract_text_from_file(resume.file.path, resume.file_type)
-
-        # Process text with spaCy
-        doc = nlp(text)
-
-        # Extract skills
-        skills = extract_skills(doc)
-
-        # Extract experience
-        experience = extract_experience(doc)
-
-        # Extract education
-        education = extract_education(doc)
-
-        # Extract keywords
-        keywords = extract_keywords(text)
-
-        # Create analysis
-        analysis = ResumeAnalysis.objects.create(
-            resume=resume,
-            skills=skills,
-            experience=experience,
-            education=education,
-            keywords=keywords
-        )
-
-        resume.status = Resume.Status.COMPLETED
-        resume.save()
+    resume = Resume.objects.get(id=resume_id)
+    Resume.objects.filter(id=resume_id).update(status=Resume.Status.PROCESSING, updated_at=timezone.now())
+    run = ProcessingRun.objects.create(resume=resume)
+    timer = StageTimer(run.id)
 
+    try:
+        # Reuse results for files that were already processed
+        with timer.stage('cache'):
+            content_hash = file_hash(resume.file.path)
+            entry = get_entry(content_hash)
+            pipeline = pipeline_key(PIPELINE, pipeline_version(PIPELINE_VERSION))
+            result = get_result(entry, pipeline)
+        run.cache_hit = result is not None
+
+        if result is None:
+            # Extract text from resume file
+            with timer.stage('extract'):
+                if entry is not None:
+                    text = entry['text']
+                else:
+                    text = extract_text_from_file(resume.file.path, resume.file_type)
+
+            with track_inference() as inference:
+                # Process text with spaCy
+                with timer.stage('nlp'):
+                    doc = inference.nlp(text)
+                with timer.stage('skills'):
+                    skills = extract_skills(doc)
+                with timer.stage('sections'):
+                    sections = classify_doc(doc)
+            run.model_load_time = inference.load_seconds
+            run.inference_time = inference.inference_seconds
+            # Outside the inference timing: keywords write document frequencies
+            with timer.stage('keywords'):
+                keywords = extract_keywords(text, registry.stop_words, resume_id=resume.id)
+
+            result = {
+                'skills': skills,
+                'experience': sections['experience'],
+                'education': sections['education'],
+                'keywords': keywords,
+            }
+            with timer.stage('cache_store'):
+                store_result(content_hash, pipeline, text, doc_entities(doc), result)
+
+        with timer.stage('structure'):
+            experiences = parse_experience(resume, result['experience'])
+            educations = parse_education(resume, result['education'])
+
+        # Create analysis and replace the structured rows parsed last time
+        with timer.stage('persist'), transaction.atomic():
+            analysis, _ = ResumeAnalysis.objects.update_or_create(resume=resume, defaults=result)
+            Experience.objects.filter(resume=resume, extracted=True).delete()
+            Experience.objects.bulk_create(experiences)
+            Education.objects.filter(resume=resume, extracted=True).delete()
+            Education.objects.bulk_create(educations)
+            Resume.objects.filter(id=resume_id).update(status=Resume.Status.COMPLETED, updated_at=timezone.now())
+
+        finish_run(run, timer, ProcessingRun.Status.COMPLETED)
         return f"Successfully processed resume {resume_id}"
 
     except Exception as e:
-        resume.status = Resume.Status.FAILED
-        resume.save()
+        Resume.objects.filter(id=resume_id).update(status=Resume.Status.FAILED, updated_at=timezone.now())
+        finish_run(run, timer, ProcessingRun.Status.FAILED, error=str(e))
         raise e
 
-def extract_text_from_file(file_path, file_type):
-    if file_type == 'pdf':
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ''
-            for page in reader.pages:
-                text += page.extract_text()
-    elif file_type == 'docx':
-        doc = docx.Document(file_path)
-        text = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-    else:
-        raise ValueError(f"Unsupported file type: {file_type}")
-    return text
-
-def extract_skills(doc):
-    skills = []
-    for ent in doc.ents:
-        if ent.label_ == 'SKILL':
-            skills.append(ent.text)
-    return skills
-
-def extract_experience(doc):
-    experience = []
-    for sent in doc.sents:
-        if any(word in sent.text.lower() for word in ['experience', 'worked', 'job', 'position']):
-            experience.append(sent.text)
-    return experience
-
-def extract_education(doc):
-    education = []
-    for sent in doc.sents:
-        if any(word in sent.text.lower() for word in ['education', 'degree', 'university', 'college']):
-            education.append(sent.text)
-    return education
-
-def extract_keywords(text):
-    # Tokenize text
-    tokens = word_tokenize(text.lower())
-    
-    # Remove stopwords and punctuation
-    stop_words = set(stopwords.words('english'))
-    keywords = [word for word in tokens if word.isalnum() and word not in stop_words]
-    
-    return keywords 
\ No newline at end of file
+def finish_run(run, timer, status, error=''):
+    run.status = status
+    run.stage_timings = timer.timings
+    run.duration = timer.duration
+    run.error = error
+    run.finished_at = timezone.now()
+    run.save(update_fields=[
+        'status', 'cache_hit', 'stage_timings', 'model_load_time', 'inference_time', 'duration', 'error', 'finished_at',
+    ])
+    cache.delete(stage_key(run.id))
@@ -1,3 +1,229 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import time
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from user_management.models import User
+from .catalog import CATALOG_VERSION_KEY, bump_catalog_version, catalog_version, pipeline_key
+from .content_cache import get_entry, store_result
+from .keywords import extract_keywords, record_document
+from .models import Education, Experience, ProcessingRun, Resume, ResumeAnalysis, TermDocumentFrequency
+from .parsing import parse_education, parse_experience
+from .sections import classify_sentences
+from .tasks import process_resume
+from .views import ProcessingStageStatsView
+
+
+class ClassifySentencesTests(SimpleTestCase):
+    def test_lines_under_a_heading_join_its_section(self):
+        sentences = [
+            'Work Experience\nSoftware Engineer at Kaspi, Jan 2018 - Mar 2021.',
+            'Built the payments platform.',
+            'Skills\nPython, Django',
+            'Education\nBSc in Physics, KBTU, 2012 - 2016',
+        ]
+        sections = classify_sentences(sentences)
+
+        self.assertEqual(sections['experience'], sentences[:2])
+        self.assertEqual(sections['education'], sentences[3:])
+
+    def test_keywords_still_classify_without_headings(self):
+        sections = classify_sentences(['Worked as a tutor.', 'Degree in Law.', 'Likes chess.'])
+
+        self.assertEqual(sections['experience'], ['Worked as a tutor.'])
+        self.assertEqual(sections['education'], ['Degree in Law.'])
+
+
+class ParsingTests(SimpleTestCase):
+    resume = Resume(id=1)
+
+    def experience(self, *sentences):
+        return [
+            (row.position, row.company, row.start_date, row.end_date)
+            for row in parse_experience(self.resume, sentences)
+        ]
+
+    def education(self, *sentences):
+        return [
+            (row.degree, row.field_of_study, row.institution, row.start_date, row.end_date)
+            for row in parse_education(self.resume, sentences)
+        ]
+
+    def test_position_at_company(self):
+        self.assertEqual(
+            self.experience('Software Engineer at Kaspi, Jan 2018 - Mar 2021.'),
+            [('Software Engineer', 'Kaspi', date(2018, 1, 1), date(2021, 3, 1))],
+        )
+
+    def test_text_after_the_dates_is_not_part_of_the_label(self):
+        self.assertEqual(
+            self.experience('Software Engineer at Kaspi, Jan 2018 - Mar 2021. Worked on payments'),
+            [('Software Engineer', 'Kaspi', date(2018, 1, 1), date(2021, 3, 1))],
+        )
+
+    def test_every_range_on_a_line(self):
+        self.assertEqual(
+            self.experience('Developer at Kolesa, 2016 - 2018; Team Lead at Kaspi, 05/2018 - present'),
+            [
+                ('Developer', 'Kolesa', date(2016, 1, 1), date(2018, 12, 1)),
+                ('Team Lead', 'Kaspi', date(2018, 5, 1), None),
+            ],
+        )
+
+    def test_leading_dates_and_dates_on_their_own_line(self):
+        self.assertEqual(
+            self.experience('2015 - 2016 Tutor at School 42. Taught math', 'Backend Engineer | Kolesa\n2019 - now'),
+            [
+                ('Tutor', 'School 42', date(2015, 1, 1), date(2016, 12, 1)),
+                ('Backend Engineer', 'Kolesa', date(2019, 1, 1), None),
+            ],
+        )
+
+    def test_degree(self):
+        self.assertEqual(
+            self.education('Bachelor of Science in Computer Science, Nazarbayev University, 2012 - 2016'),
+            [('Bachelor of Science', 'Computer Science', 'Nazarbayev University', date(2012, 1, 1), date(2016, 12, 1))],
+        )
+
+    def test_sentence_in_both_sections_gives_one_row(self):
+        job = 'Lecturer at Satbayev University, 2019 - present'
+        degree = 'Master of Arts in History, Satbayev University, 2017 - 2019'
+
+        self.assertEqual(self.experience(job, degree), [('Lecturer', 'Satbayev University', date(2019, 1, 1), None)])
+        self.assertEqual([row[0] for row in self.education(job, degree)], ['Master of Arts'])
+
+    def test_job_without_degree_or_institution_is_not_education(self):
+        self.assertEqual(self.education('Worked at the university library, 2014 - 2016, degree pending'), [])
+        self.assertEqual(self.education('Software Engineer at Kaspi, 2018 - 2021'), [])
+
+
+class ContentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_new_catalog_version_replaces_the_pipeline_result(self):
+        store_result('a' * 64, pipeline_key('other', 'f1'), 'cv', [], {'kept': True})
+        old = pipeline_key('resume_processing', 'f1')
+        store_result('a' * 64, old, 'cv', [], {'skills': []})
+        bump_catalog_version()
+        new = pipeline_key('resume_processing', 'f1')
+        store_result('a' * 64, new, 'cv', [], {'skills': ['Python']})
+
+        results = get_entry('a' * 64)['results']
+        self.assertNotIn(old, results)
+        self.assertEqual(results[new], {'skills': ['Python']})
+        self.assertEqual(len(results), 2)
+
+    def test_evicted_version_does_not_return_to_an_old_value(self):
+        before = catalog_version()
+        bump_catalog_version()
+        bumped = catalog_version()
+        cache.delete(CATALOG_VERSION_KEY)
+        time.sleep(0.001)
+
+        self.assertGreater(bumped, before)
+        self.assertGreater(catalog_version(), bumped)
+
+
+class DocumentFrequencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='seeker', email='seeker@example.com', password='pass')
+        self.resumes = [
+            Resume.objects.create(user=user, file=f'resumes/{i}.pdf', original_filename=f'{i}.pdf', file_type='pdf')
+            for i in range(2)
+        ]
+
+    def counts(self):
+        return dict(TermDocumentFrequency.objects.filter(document_count__gt=0).values_list('term', 'document_count'))
+
+    def test_each_resume_is_counted_once(self):
+        first, second = self.resumes
+        record_document(first.id, ['python', 'django'])
+        self.assertFalse(record_document(first.id, ['django', 'python']))
+        record_document(second.id, ['python'])
+
+        self.assertEqual(self.counts(), {'python': 2, 'django': 1})
+
+    def test_reprocessing_moves_only_the_difference(self):
+        first, second = self.resumes
+        record_document(first.id, ['python', 'django'])
+        record_document(second.id, ['python'])
+        record_document(first.id, ['python', 'flask'])
+
+        self.assertEqual(self.counts(), {'python': 2, 'flask': 1})
+
+    def test_rare_terms_outrank_common_ones(self):
+        first, second = self.resumes
+        extract_keywords('python django', resume_id=first.id)
+
+        self.assertEqual(extract_keywords('python flask', n=1, resume_id=second.id), ['flask'])
+
+
+class ProcessResumeTests(TestCase):
+    result = {
+        'skills': ['Python'],
+        'experience': ['Software Engineer at Kaspi, Jan 2018 - Mar 2021.'],
+        'education': ['BSc in Physics, KBTU University, 2012 - 2016'],
+        'keywords': ['kaspi'],
+    }
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        media_settings = override_settings(MEDIA_ROOT=media)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        user = User.objects.create_user(username='seeker', email='seeker@example.com', password='pass')
+        self.resume = Resume.objects.create(
+            user=user,
+            file=SimpleUploadedFile('cv.txt', b'cv'),
+            original_filename='cv.txt',
+            file_type='txt',
+        )
+        Experience.objects.create(
+            resume=self.resume, company='Manual', position='Entered by hand', start_date=date(2010, 1, 1)
+        )
+
+    def test_reprocessing_replaces_analysis_and_extracted_rows(self):
+        with mock.patch('resume_processing.tasks.get_result', return_value=self.result):
+            process_resume(self.resume.id)
+            process_resume(self.resume.id)
+
+        self.assertEqual(ResumeAnalysis.objects.filter(resume=self.resume).count(), 1)
+        self.assertEqual(
+            sorted(Experience.objects.filter(resume=self.resume).values_list('company', 'extracted')),
+            [('Kaspi', True), ('Manual', False)],
+        )
+        self.assertEqual(Education.objects.filter(resume=self.resume).count(), 1)
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.status, Resume.Status.COMPLETED)
+
+
+class ProcessingStageStatsTests(TestCase):
+    def test_model_load_and_inference_are_reported_apart(self):
+        user = User.objects.create_user(username='admin', email='admin@example.com', password='pass', is_staff=True)
+        resume = Resume.objects.create(user=user, file='resumes/cv.pdf', original_filename='cv.pdf', file_type='pdf')
+        for load, inference in [(2.0, 0.5), (0.0, 0.25), (None, None)]:
+            ProcessingRun.objects.create(
+                resume=resume,
+                status=ProcessingRun.Status.COMPLETED,
+                stage_timings={'nlp': 1.0},
+                model_load_time=load,
+                inference_time=inference,
+            )
+        request = APIRequestFactory().get('/api/processing-runs/stats/')
+        force_authenticate(request, user=user)
+
+        data = ProcessingStageStatsView.as_view()(request).data
+
+        self.assertEqual(data['runs'], 3)
+        self.assertEqual(data['models']['model_load']['total'], 2.0)
+        self.assertEqual(data['models']['inference']['runs'], 2)
+        self.assertEqual(data['models']['inference']['mean'], 0.375)
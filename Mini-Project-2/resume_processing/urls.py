@@ -11,6 +11,10 @@ urlpatterns = [
     path('resumes/<int:pk>/analysis/', views.ResumeAnalysisView.as_view(), name='resume-analysis'),
     path('resumes/<int:pk>/feedback/', views.ResumeFeedbackView.as_view(), name='resume-feedback'),
     
+    # Processing run endpoints
+    path('resumes/<int:pk>/processing-runs/', views.ProcessingRunListView.as_view(), name='processing-run-list'),
+    path('processing-runs/stats/', views.ProcessingStageStatsView.as_view(), name='processing-stage-stats'),
+    
     # Skills endpoints
     path('skills/', views.SkillListView.as_view(), name='skill-list'),
     
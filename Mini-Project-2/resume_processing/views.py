@@ -3,7 +3,7 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
-from .models import Resume, ResumeAnalysis, Skill, Experience, Education
+from .models import Resume, ResumeAnalysis, ProcessingRun, Skill, Experience, Education
 from .serializers import (
     ResumeSerializer,
     ResumeUploadSerializer,
@@ -11,7 +11,8 @@ from .serializers import (
     SkillSerializer,
     ExperienceSerializer,
     EducationSerializer,
-    ResumeFeedbackSerializer
+    ResumeFeedbackSerializer,
+    ProcessingRunSerializer
 )
 from .tasks import process_resume
 
@@ -53,6 +54,48 @@ class ResumeAnalysisView(generics.RetrieveAPIView):
         resume = get_object_or_404(Resume, id=self.kwargs['pk'], user=self.request.user)
         return resume.analysis
 
+class ProcessingRunListView(generics.ListAPIView):
+    serializer_class = ProcessingRunSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ProcessingRun.objects.filter(resume_id=self.kwargs['pk'], resume__user=self.request.user)
+
+class ProcessingStageStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 1000)), 10000)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        runs = ProcessingRun.objects.filter(status=ProcessingRun.Status.COMPLETED)
+        rows = list(runs.values_list('stage_timings', 'model_load_time', 'inference_time')[:limit])
+
+        stages = {}
+        for run_timings, _, _ in rows:
+            for stage, seconds in run_timings.items():
+                stages.setdefault(stage, []).append(seconds)
+        stats = {stage: summarize(values) for stage, values in stages.items()}
+        dominant = max(stats, key=lambda stage: stats[stage]['total']) if stats else None
+        # Cache hits skip the models, so only runs that used them count here
+        models = {
+            'model_load': summarize([load for _, load, _ in rows if load is not None]),
+            'inference': summarize([seconds for _, _, seconds in rows if seconds is not None]),
+        }
+        return Response({'runs': len(rows), 'dominant_stage': dominant, 'stages': stats, 'models': models})
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return {'runs': 0, 'mean': None, 'p95': None, 'total': 0.0}
+    return {
+        'runs': len(values),
+        'mean': sum(values) / len(values),
+        'p95': values[max(int(len(values) * 0.95) - 1, 0)],
+        'total': sum(values),
+    }
+
 class SkillListView(generics.ListAPIView):
     serializer_class = SkillSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from kombu import Queue
 
 load_dotenv()
 
@@ -166,6 +167,25 @@ CELERY_TIMEZONE = "UTC"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+# Each trading.shard.N queue must have exactly one solo-pool consumer
+TRADING_SHARDS = int(os.getenv('TRADING_SHARDS', 2))
+TRADING_JOURNAL_DIR = os.getenv('TRADING_JOURNAL_DIR', BASE_DIR / 'journal')
+TRADING_JOURNAL_SYNC_INTERVAL = float(os.getenv('TRADING_JOURNAL_SYNC_INTERVAL', 0.005))
+TRADING_JOURNAL_SYNC_RECORDS = int(os.getenv('TRADING_JOURNAL_SYNC_RECORDS', 256))
+TRADING_FLUSH_INTERVAL = float(os.getenv('TRADING_FLUSH_INTERVAL', 0.2))
+TRADING_FLUSH_BATCH = int(os.getenv('TRADING_FLUSH_BATCH', 500))
+TRADING_SNAPSHOT_RECORDS = int(os.getenv('TRADING_SNAPSHOT_RECORDS', 50000))
+
+CELERY_TASK_QUEUES = (
+    Queue('default'),
+    Queue('notifications'),
+    *(Queue(f'trading.shard.{shard}') for shard in range(TRADING_SHARDS)),
+)
+CELERY_TASK_ROUTES = {
+    'trading.tasks.send_order_status_email': {'queue': 'notifications'},
+}
+
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -1,22 +1,57 @@
-from django.contrib import admin
-from .models import Order, Transaction
+from django.contrib import admin, messages
+from .models import Order, OrderStatus, Transaction
+from .order_service import complete_orders
+from .tasks import request_cancel
 
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "product", "order_type", "quantity", "status", "created_at")
-    list_filter = ("status", "order_type", "created_at")
+    list_display = ("id", "user", "product", "order_type", "quantity", "status", "accepted", "created_at")
+    list_filter = ("status", "accepted", "order_type", "created_at")
     search_fields = ("user__username", "product__name")
     ordering = ("-created_at",)
     actions = ["mark_completed", "mark_canceled"]
 
     def mark_completed(self, request, queryset):
-        queryset.update(status="completed")
-    mark_completed.short_description = "Mark selected orders as Completed"
+        # Orders the matching engine has accepted can only fill or be canceled there
+        selected = list(queryset.values_list("id", flat=True))
+        completed = complete_orders(selected)
+        skipped = len(selected) - len(completed)
+        self.message_user(request, f"Completed {len(completed)} selected orders.")
+        if skipped:
+            self.message_user(
+                request,
+                f"Skipped {skipped} orders that are no longer pending, are locked, or were already accepted by "
+                "the matching engine. Cancel accepted orders instead.",
+                messages.WARNING,
+            )
+    mark_completed.short_description = "Complete selected orders not yet accepted by the matching engine"
 
     def mark_canceled(self, request, queryset):
-        queryset.update(status="canceled")
-    mark_canceled.short_description = "Mark selected orders as Canceled"
+        # Resting orders live in a shard's book, so cancels go through its worker
+        orders = queryset.filter(status=OrderStatus.PENDING).values_list("id", "product_id")
+        for order_id, product_id in orders:
+            request_cancel(order_id, product_id)
+        self.message_user(request, f"Requested cancellation of {len(orders)} pending orders.")
+    mark_canceled.short_description = "Cancel selected orders"
+
+    def get_readonly_fields(self, request, obj=None):
+        # Only orders the matching engine has not taken yet may be edited here
+        if obj is not None and (obj.accepted or obj.status != OrderStatus.PENDING):
+            return [field.name for field in obj._meta.fields]
+        if obj is not None:
+            # Its match_order task is already queued on the product's shard
+            return ["product", "status", "accepted", "filled_quantity"]
+        return super().get_readonly_fields(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        if obj is not None and obj.accepted and obj.status == OrderStatus.PENDING:
+            return False
+        return super().has_delete_permission(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        # Bulk deletes skip orders resting in a shard's book, like the form does
+        queryset.exclude(status=OrderStatus.PENDING, accepted=True).delete()
 
 
 @admin.register(Transaction)
@@ -0,0 +1,175 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+CREATE = 1
+CANCEL = 2
+FILL = 3
+
+# lsn, record type, payload length, crc32 of everything but the crc itself
+HEADER = struct.Struct("<QBII")
+PAYLOADS = {
+    # order id, product id, is buy, quantity, remaining, price in cents (-1 for market)
+    CREATE: struct.Struct("<QQ?IIq"),
+    # order id, product id
+    CANCEL: struct.Struct("<QQ"),
+    # product id, buy order id, sell order id, price in cents, quantity
+    FILL: struct.Struct("<QQQqI"),
+}
+
+SNAPSHOT_MAGIC = b"TSNP1"
+SNAPSHOT_HEADER = struct.Struct("<QQ")
+SNAPSHOT_ORDER = PAYLOADS[CREATE]
+
+
+class JournalError(Exception):
+    pass
+
+
+def encode(lsn, kind, *fields):
+    payload = PAYLOADS[kind].pack(*fields)
+    head = struct.pack("<QBI", lsn, kind, len(payload))
+    return HEADER.pack(lsn, kind, len(payload), zlib.crc32(head + payload)) + payload
+
+
+def scan(data):
+    """Yield ``(lsn, kind, fields, end_offset)`` for every intact record.
+
+    Scanning stops at the first torn or corrupt record, which can only be
+    the unsynced tail left by a crash.
+    """
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        lsn, kind, length, crc = HEADER.unpack_from(data, offset)
+        start = offset + HEADER.size
+        payload = data[start:start + length]
+        if kind not in PAYLOADS or len(payload) != length or length != PAYLOADS[kind].size:
+            return
+        if zlib.crc32(struct.pack("<QBI", lsn, kind, length) + payload) != crc:
+            return
+        offset = start + length
+        yield lsn, kind, PAYLOADS[kind].unpack(payload), offset
+
+
+def read_journal(path):
+    if not os.path.exists(path):
+        return b""
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def read_records(path):
+    for lsn, kind, fields, _ in scan(read_journal(path)):
+        yield lsn, kind, fields
+
+
+class Journal:
+    """Append-only order event log with group commit.
+
+    Appends go to the OS buffer immediately; ``commit`` fsyncs once enough
+    records are waiting or the oldest unsynced record has waited
+    ``sync_interval`` seconds, so one fsync covers every record in that
+    window.
+    """
+
+    def __init__(self, path, start_lsn=0, sync_interval=0.005, sync_records=256):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.sync_records = sync_records
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.pending_since = None
+        self.syncs = 0
+
+        # LSNs keep growing across truncation, so resume after the snapshot's
+        self.lsn, valid_length = start_lsn, 0
+        for lsn, _, _, valid_length in scan(read_journal(path)):
+            self.lsn = max(self.lsn, lsn)
+        self.synced_lsn = self.lsn
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "ab")
+        # Cut off a torn tail so new records are not appended after garbage
+        if self._file.tell() != valid_length:
+            self._file.truncate(valid_length)
+            os.fsync(self._file.fileno())
+
+    def append(self, kind, *fields):
+        with self._lock:
+            self.lsn += 1
+            self._file.write(encode(self.lsn, kind, *fields))
+            self.pending += 1
+            if self.pending_since is None:
+                self.pending_since = time.monotonic()
+            return self.lsn
+
+    def commit(self, force=False):
+        with self._lock:
+            if not self.pending:
+                return self.synced_lsn
+            due = (
+                force
+                or self.pending >= self.sync_records
+                or time.monotonic() - self.pending_since >= self.sync_interval
+            )
+            if due:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.synced_lsn = self.lsn
+                self.pending = 0
+                self.pending_since = None
+                self.syncs += 1
+            return self.synced_lsn
+
+    def truncate(self):
+        """Drop every record; only safe once a snapshot covers them."""
+        with self._lock:
+            self._file.flush()
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self.pending = 0
+            self.pending_since = None
+            self.synced_lsn = self.lsn
+
+    def close(self):
+        self.commit(force=True)
+        self._file.close()
+
+
+def write_snapshot(path, lsn, orders):
+    """Atomically replace the snapshot with ``orders`` as of ``lsn``.
+
+    ``orders`` are CREATE-style tuples in book priority order.
+    """
+    body = bytearray(SNAPSHOT_HEADER.pack(lsn, len(orders)))
+    for fields in orders:
+        body += SNAPSHOT_ORDER.pack(*fields)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(SNAPSHOT_MAGIC + body + struct.pack("<I", zlib.crc32(body)))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    """Return ``(lsn, orders)`` from a snapshot, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as file:
+        data = file.read()
+    body = data[len(SNAPSHOT_MAGIC):-4]
+    if not data.startswith(SNAPSHOT_MAGIC) or len(data) < len(SNAPSHOT_MAGIC) + SNAPSHOT_HEADER.size + 4:
+        raise JournalError(f"Malformed snapshot {path}")
+    if zlib.crc32(body) != struct.unpack("<I", data[-4:])[0]:
+        raise JournalError(f"Snapshot checksum mismatch in {path}")
+    lsn, count = SNAPSHOT_HEADER.unpack_from(body)
+    if len(body) != SNAPSHOT_HEADER.size + count * SNAPSHOT_ORDER.size:
+        raise JournalError(f"Truncated snapshot {path}")
+    orders = [
+        SNAPSHOT_ORDER.unpack_from(body, SNAPSHOT_HEADER.size + i * SNAPSHOT_ORDER.size)
+        for i in range(count)
+    ]
+    return lsn, orders
@@ -0,0 +1,67 @@
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from trading.journal import CREATE, FILL, Journal
+from trading.models import OrderType
+from trading.order_service import MatchingEngine
+
+
+def generate_orders(count, products, seed=0, market_ratio=0.05):
+    rng = random.Random(seed)
+    orders = []
+    for order_id in range(1, count + 1):
+        side = OrderType.BUY if rng.random() < 0.5 else OrderType.SELL
+        # Prices cluster around 100.00 so books cross often
+        price = None if rng.random() < market_ratio else 10000 + rng.randint(-50, 50)
+        orders.append((order_id, rng.randrange(products), side, rng.randint(1, 100), price))
+    return orders
+
+
+class Command(BaseCommand):
+    help = "Measure in-memory matching throughput on one core"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=200000)
+        parser.add_argument("--products", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--journal", action="store_true", help="Also journal every order and fill")
+        parser.add_argument("--sync-interval", type=float, default=0.005)
+
+    def handle(self, *args, **options):
+        orders = generate_orders(options["orders"], options["products"], options["seed"])
+        engine = MatchingEngine()
+        journal = None
+        if options["journal"]:
+            directory = tempfile.mkdtemp()
+            journal = Journal(os.path.join(directory, "benchmark.journal"), sync_interval=options["sync_interval"])
+
+        fills = 0
+        started = time.perf_counter()
+        for order_id, product_id, side, quantity, price in orders:
+            if journal is not None:
+                journal.append(
+                    CREATE, order_id, product_id, side == OrderType.BUY, quantity, quantity, -1 if price is None else price
+                )
+            order_fills = engine.submit(order_id, product_id, side, quantity, price)[1]
+            if journal is not None:
+                for fill in order_fills:
+                    journal.append(FILL, product_id, fill.buy.id, fill.sell.id, fill.price, fill.quantity)
+                journal.commit()
+            fills += len(order_fills)
+        if journal is not None:
+            journal.close()
+        elapsed = time.perf_counter() - started
+
+        resting = sum(len(book.orders) for book in engine.books.values())
+        self.stdout.write(
+            f"{len(orders)} orders, {fills} fills, {resting} resting in {elapsed:.3f}s"
+        )
+        if journal is not None:
+            self.stdout.write(f"{journal.lsn} journal records, {journal.syncs} fsyncs")
+            os.remove(journal.path)
+            os.rmdir(os.path.dirname(journal.path))
+        self.stdout.write(self.style.SUCCESS(f"{len(orders) / elapsed:,.0f} orders/s"))
@@ -0,0 +1,36 @@
+import uuid
+
+from django.db import migrations, models
+
+
+def generate_ack_ids(apps, schema_editor):
+    Order = apps.get_model('trading', 'Order')
+    for order in Order.objects.only('id').iterator():
+        order.ack_id = uuid.uuid4()
+        order.save(update_fields=['ack_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trading', '0002_order_price_filled_quantity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='ack_id',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(generate_ack_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='ack_id',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='accepted',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,3 +1,4 @@
+import uuid
 from decimal import Decimal
 
 from django.core.validators import MinValueValidator
@@ -31,6 +32,15 @@ class Order(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="orders")
     order_type = models.CharField(max_length=15, choices=OrderType.choices)
     quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    # Limit price per unit; market orders leave it empty
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True, validators=[MinValueValidator(Decimal('0.01'))]
+    )
+    filled_quantity = models.PositiveIntegerField(default=0)
+    # Returned on create so clients can poll the order's progress through matching
+    ack_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    # Set once a matching worker has taken the order into its book
+    accepted = models.BooleanField(default=False)
     status = models.CharField(max_length=15, choices=OrderStatus.choices, default=OrderStatus.PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -41,6 +51,13 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["product", "status", "created_at"], name="order_product_status_idx"),
+        ]
+
+    @property
+    def remaining_quantity(self):
+        return self.quantity - self.filled_quantity
 
     def mark_as_completed(self):
         self.status = OrderStatus.COMPLETED
@@ -58,6 +75,8 @@ class TransactionQuerySet(models.QuerySet):
 
 class Transaction(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="transactions")
+    # Units filled by this transaction; price is the total for those units
+    quantity = models.PositiveIntegerField(null=True, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
     executed_at = models.DateTimeField(auto_now_add=True)
 
@@ -68,3 +87,13 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ["-executed_at"]
+
+
+class JournalCheckpoint(models.Model):
+    # Last journal record of a matching shard whose effects are in the tables
+    shard = models.PositiveIntegerField(unique=True)
+    lsn = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Shard {self.shard} at {self.lsn}"
@@ -0,0 +1,251 @@
+import heapq
+import itertools
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+
+from trading.models import Order, OrderStatus, OrderType, Transaction
+
+# Prices are matched as integer cents so comparisons never touch Decimal
+TICKS_PER_UNIT = 100
+
+Fill = namedtuple("Fill", ["buy", "sell", "price", "quantity"])
+
+
+def to_ticks(price):
+    if price is None:
+        return None
+    return int(Decimal(price) * TICKS_PER_UNIT)
+
+
+def from_ticks(ticks):
+    return (Decimal(ticks) / TICKS_PER_UNIT).quantize(Decimal("0.01"))
+
+
+class BookOrder:
+    __slots__ = ("id", "side", "price", "quantity", "remaining", "status")
+
+    def __init__(self, order_id, side, quantity, price=None, remaining=None):
+        self.id = order_id
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.remaining = quantity if remaining is None else remaining
+        self.status = OrderStatus.PENDING
+
+    @property
+    def filled(self):
+        return self.quantity - self.remaining
+
+
+class OrderBook:
+    """Price-time priority book for one product.
+
+    Bids and asks are heaps keyed on price and arrival sequence. Canceled
+    orders stay in the heap and are dropped when they reach the top.
+    """
+
+    def __init__(self, product_id):
+        self.product_id = product_id
+        self.bids = []
+        self.asks = []
+        self.orders = {}
+        self._sequence = itertools.count()
+
+    def best_bid(self):
+        self._discard_dead(self.bids)
+        return -self.bids[0][0] if self.bids else None
+
+    def best_ask(self):
+        self._discard_dead(self.asks)
+        return self.asks[0][0] if self.asks else None
+
+    def add(self, order):
+        """Match ``order`` against the opposite side and rest any remainder.
+
+        Limit orders rest at their price; whatever a market order cannot
+        fill immediately is canceled.
+        """
+        fills = []
+        buying = order.side == OrderType.BUY
+        opposite = self.asks if buying else self.bids
+        while order.remaining and opposite:
+            _, _, resting = opposite[0]
+            if resting.status != OrderStatus.PENDING:
+                heapq.heappop(opposite)
+                continue
+            price = resting.price
+            if order.price is not None and (price > order.price if buying else price < order.price):
+                break
+
+            quantity = min(order.remaining, resting.remaining)
+            order.remaining -= quantity
+            resting.remaining -= quantity
+            fills.append(Fill(order, resting, price, quantity) if buying else Fill(resting, order, price, quantity))
+            if not resting.remaining:
+                resting.status = OrderStatus.COMPLETED
+                heapq.heappop(opposite)
+                del self.orders[resting.id]
+
+        if not order.remaining:
+            order.status = OrderStatus.COMPLETED
+        elif order.price is None:
+            order.status = OrderStatus.CANCELED
+        else:
+            self.rest(order)
+        return fills
+
+    def rest(self, order):
+        key = -order.price if order.side == OrderType.BUY else order.price
+        heapq.heappush(self.bids if order.side == OrderType.BUY else self.asks, (key, next(self._sequence), order))
+        self.orders[order.id] = order
+
+    def resting(self):
+        """Pending orders on both sides in arrival order."""
+        entries = sorted(
+            (entry for entry in self.bids + self.asks if entry[2].status == OrderStatus.PENDING),
+            key=lambda entry: entry[1],
+        )
+        return [order for _, _, order in entries]
+
+    def cancel(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        order.status = OrderStatus.CANCELED
+        return order
+
+    def _discard_dead(self, side):
+        while side and side[0][2].status != OrderStatus.PENDING:
+            heapq.heappop(side)
+
+
+class FillWriter:
+    """Buffers engine results and writes them to the database in batches.
+
+    Each flush inserts one Transaction per order per fill and updates every
+    touched Order in a single database transaction.
+    """
+
+    def __init__(self, batch_size=500):
+        # batch_size=None leaves every flush to the caller
+        self.batch_size = batch_size
+        self.fills = []
+        self.orders = {}
+
+    def __len__(self):
+        return max(len(self.fills), len(self.orders))
+
+    def record(self, order, fills=()):
+        self.orders[order.id] = order
+        for fill in fills:
+            self.orders[fill.buy.id] = fill.buy
+            self.orders[fill.sell.id] = fill.sell
+            self.fills.append(fill)
+        if self.batch_size and len(self) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.orders:
+            return 0
+        transactions = [
+            Transaction(order_id=order.id, quantity=fill.quantity, price=from_ticks(fill.price * fill.quantity))
+            for fill in self.fills
+            for order in (fill.buy, fill.sell)
+        ]
+        updates = [
+            Order(id=order.id, filled_quantity=order.filled, status=order.status, accepted=True)
+            for order in self.orders.values()
+        ]
+        with transaction.atomic():
+            Transaction.objects.bulk_create(transactions, batch_size=1000)
+            Order.objects.bulk_update(updates, ["filled_quantity", "status", "accepted"], batch_size=1000)
+        self.fills = []
+        self.orders = {}
+        return len(transactions)
+
+
+class MatchingEngine:
+    """In-memory order books keyed by product id."""
+
+    def __init__(self, writer=None):
+        self.books = {}
+        self.writer = writer
+
+    def book(self, product_id):
+        book = self.books.get(product_id)
+        if book is None:
+            book = self.books[product_id] = OrderBook(product_id)
+        return book
+
+    def submit(self, order_id, product_id, side, quantity, price=None, remaining=None):
+        order = BookOrder(order_id, side, quantity, price, remaining)
+        fills = self.book(product_id).add(order)
+        if self.writer is not None:
+            self.writer.record(order, fills)
+        return order, fills
+
+    def submit_order(self, order):
+        return self.submit(
+            order.id, order.product_id, order.order_type, order.quantity, to_ticks(order.price), order.remaining_quantity
+        )
+
+    def cancel(self, product_id, order_id):
+        order = self.book(product_id).cancel(order_id)
+        if order is not None and self.writer is not None:
+            self.writer.record(order)
+        return order
+
+    def load(self, orders=None):
+        """Rest accepted, pending limit orders from the database in arrival order."""
+        if orders is None:
+            orders = Order.objects.filter(status=OrderStatus.PENDING, accepted=True, price__isnull=False)
+        rows = orders.order_by("created_at", "id").values_list(
+            "id", "product_id", "order_type", "quantity", "filled_quantity", "price"
+        )
+        count = 0
+        for order_id, product_id, side, quantity, filled, price in rows.iterator(chunk_size=5000):
+            self.book(product_id).rest(BookOrder(order_id, side, quantity, to_ticks(price), quantity - filled))
+            count += 1
+        return count
+
+    def flush(self):
+        return self.writer.flush() if self.writer is not None else 0
+
+
+def complete_orders(order_ids, skip_locked=True):
+    """Fill the remainder of pending orders at product price in one transaction.
+
+    Rows are locked with ``SELECT ... FOR UPDATE``; with ``skip_locked`` rows
+    another worker holds are left out instead of waited on. Orders already
+    claimed by a shard engine are not touched, and the status update is
+    conditional on ``pending``, so an order is never completed twice.
+    Returns the ids that were completed.
+    """
+    with transaction.atomic():
+        rows = list(
+            Order.objects.select_for_update(skip_locked=skip_locked, of=("self",))
+            .filter(id__in=order_ids, status=OrderStatus.PENDING, accepted=False)
+            .order_by("id")
+            .values_list("id", "quantity", "filled_quantity", "product__price")
+        )
+        if not rows:
+            return []
+        ids = [order_id for order_id, _, _, _ in rows]
+        Order.objects.filter(id__in=ids, status=OrderStatus.PENDING).update(
+            status=OrderStatus.COMPLETED, filled_quantity=F("quantity")
+        )
+        Transaction.objects.bulk_create(
+            [
+                Transaction(order_id=order_id, quantity=quantity - filled, price=Decimal(price) * (quantity - filled))
+                for order_id, quantity, filled, price in rows
+            ],
+            batch_size=1000,
+        )
+    return ids
+
+
+def complete_order(order_id, skip_locked=False):
+    return bool(complete_orders([order_id], skip_locked=skip_locked))
@@ -9,8 +9,17 @@ class OrderSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Order
-        fields = ["id", "user", "product", "order_type", "order_type_display", "quantity", "status", "status_display", "created_at"]
-        read_only_fields = ["status", "created_at"]
+        fields = [
+            "id", "ack_id", "user", "product", "order_type", "order_type_display", "quantity", "price",
+            "filled_quantity", "status", "status_display", "created_at",
+        ]
+        read_only_fields = ["ack_id", "filled_quantity", "status", "created_at"]
+
+    def validate_product(self, value):
+        # The order is already queued on its product's shard
+        if self.instance is not None and value != self.instance.product:
+            raise serializers.ValidationError("The product of an order cannot be changed.")
+        return value
 
 
 class TransactionSerializer(serializers.ModelSerializer):
@@ -18,5 +27,20 @@ class TransactionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Transaction
-        fields = ["id", "order", "price", "executed_at"]
+        fields = ["id", "order", "quantity", "price", "executed_at"]
         read_only_fields = ["executed_at"]
+
+
+class FillSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Transaction
+        fields = ["id", "quantity", "price", "executed_at"]
+
+
+class OrderAckSerializer(serializers.ModelSerializer):
+    remaining_quantity = serializers.IntegerField(read_only=True)
+    fills = FillSerializer(source="transactions", many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ["id", "ack_id", "accepted", "status", "quantity", "filled_quantity", "remaining_quantity", "fills"]
@@ -0,0 +1,274 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models.functions import Mod
+
+from trading.journal import CANCEL, CREATE, FILL, Journal, JournalError, read_records, read_snapshot, write_snapshot
+from trading.models import JournalCheckpoint, Order, OrderStatus, OrderType
+from trading.order_service import BookOrder, FillWriter, MatchingEngine, to_ticks
+
+logger = logging.getLogger(__name__)
+
+
+def shard_count():
+    return getattr(settings, "TRADING_SHARDS", 2)
+
+
+def shard_for(product_id):
+    return product_id % shard_count()
+
+
+def shard_queue(product_id):
+    return f"trading.shard.{shard_for(product_id)}"
+
+
+class Shard:
+    """Matching engine, journal and snapshots for one shard.
+
+    Every state change is journaled before it is applied. Database writes
+    are batched and each batch records the journal position it covers, so
+    recovery knows which replayed records still have to be written.
+    """
+
+    def __init__(self, shard_id):
+        self.id = shard_id
+        self.lock = threading.RLock()
+        self.engine = MatchingEngine(FillWriter(batch_size=None))
+        # Orders journaled since the last snapshot whose accepted flag may not be flushed yet
+        self.seen = set()
+        directory = str(getattr(settings, "TRADING_JOURNAL_DIR", "journal"))
+        self.journal_path = os.path.join(directory, f"shard-{shard_id}.journal")
+        self.snapshot_path = os.path.join(directory, f"shard-{shard_id}.snapshot")
+        self.flush_interval = getattr(settings, "TRADING_FLUSH_INTERVAL", 0.2)
+        self.flush_batch = getattr(settings, "TRADING_FLUSH_BATCH", 500)
+        self.snapshot_records = getattr(settings, "TRADING_SNAPSHOT_RECORDS", 50000)
+        self.flushed_at = time.monotonic()
+        self.snapshot_lsn = 0
+        self.checkpoint_lsn = 0
+        self.recover()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._commit_loop, name=f"trading-shard-{shard_id}", daemon=True)
+        self.thread.start()
+
+    def orders(self):
+        return Order.objects.annotate(shard=Mod("product_id", shard_count())).filter(shard=self.id)
+
+    def recover(self):
+        checkpoint = JournalCheckpoint.objects.filter(shard=self.id).values_list("lsn", flat=True).first() or 0
+        self.checkpoint_lsn = checkpoint
+        try:
+            snapshot = read_snapshot(self.snapshot_path)
+        except JournalError as e:
+            logger.warning("Ignoring snapshot for shard %s: %s", self.id, e)
+            snapshot = None
+
+        try:
+            if snapshot is None or snapshot[0] > checkpoint:
+                raise JournalError("no snapshot consistent with the database")
+            lsn, orders = snapshot
+            for fields in orders:
+                self._rest(*fields)
+            lsn = self._replay(after=lsn, persisted=checkpoint)
+            if lsn < checkpoint:
+                raise JournalError(f"journal ends at {lsn} before checkpoint {checkpoint}")
+        except JournalError as e:
+            # The tables hold every write up to the checkpoint, so resubmitting
+            # their pending orders below rebuilds the books
+            logger.warning("Rebuilding shard %s from the database: %s", self.id, e)
+            self.engine = MatchingEngine(FillWriter(batch_size=None))
+            self.seen.clear()
+            if os.path.exists(self.journal_path):
+                os.replace(self.journal_path, f"{self.journal_path}.corrupt")
+            lsn = checkpoint
+
+        self.journal = Journal(
+            self.journal_path,
+            start_lsn=max(lsn, checkpoint),
+            sync_interval=getattr(settings, "TRADING_JOURNAL_SYNC_INTERVAL", 0.005),
+            sync_records=getattr(settings, "TRADING_JOURNAL_SYNC_RECORDS", 256),
+        )
+        self.snapshot()
+
+        # After the snapshot every claimed pending order should be resting. Any
+        # other was lost from the unsynced journal tail, so match it again in
+        # arrival order; unclaimed orders are left to their queued tasks.
+        resting = {order_id for book in self.engine.books.values() for order_id in book.orders}
+        pending = self.orders().filter(status=OrderStatus.PENDING, accepted=True).exclude(id__in=resting).order_by("id")
+        for order in pending.iterator():
+            self.place(order)
+
+    def _rest(self, order_id, product_id, is_buy, quantity, remaining, price):
+        side = OrderType.BUY if is_buy else OrderType.SELL
+        self.engine.book(product_id).rest(BookOrder(order_id, side, quantity, price, remaining))
+
+    def _replay(self, after, persisted):
+        """Re-apply journal records after ``after``; returns the last lsn applied."""
+        writer = self.engine.writer
+        expected = []
+        last = after
+        try:
+            for lsn, kind, fields in read_records(self.journal_path):
+                if lsn <= after:
+                    continue
+                last = lsn
+                # Effects up to the checkpoint are already in the tables
+                self.engine.writer = writer if lsn > persisted else None
+                if kind == CREATE:
+                    if expected:
+                        raise JournalError(f"missing fill records before {lsn}")
+                    order_id, product_id, is_buy, quantity, remaining, price = fields
+                    side = OrderType.BUY if is_buy else OrderType.SELL
+                    _, fills = self.engine.submit(
+                        order_id, product_id, side, quantity, None if price < 0 else price, remaining
+                    )
+                    expected = [(product_id, fill.buy.id, fill.sell.id, fill.price, fill.quantity) for fill in fills]
+                    self.seen.add(order_id)
+                elif kind == FILL:
+                    # Matching is deterministic, so replayed fills must agree with the journal
+                    if not expected or expected.pop(0) != fields:
+                        raise JournalError(f"fill record {lsn} does not match replay")
+                elif kind == CANCEL:
+                    self.engine.cancel(fields[1], fields[0])
+        finally:
+            self.engine.writer = writer
+        return last
+
+    def place(self, order):
+        """Journal and match one order; returns the ids it completed."""
+        with self.lock:
+            if order.id in self.seen:
+                return []
+            price = to_ticks(order.price)
+            self.journal.append(
+                CREATE, order.id, order.product_id, order.order_type == OrderType.BUY,
+                order.quantity, order.remaining_quantity, -1 if price is None else price,
+            )
+            book_order, fills = self.engine.submit_order(order)
+            for fill in fills:
+                self.journal.append(FILL, order.product_id, fill.buy.id, fill.sell.id, fill.price, fill.quantity)
+            self.seen.add(order.id)
+            self._after_write()
+        touched = {book_order, *(fill.buy for fill in fills), *(fill.sell for fill in fills)}
+        return [touched_order.id for touched_order in touched if touched_order.status == OrderStatus.COMPLETED]
+
+    def cancel(self, order_id, product_id):
+        with self.lock:
+            if order_id in self.engine.book(product_id).orders:
+                self.journal.append(CANCEL, order_id, product_id)
+                self.engine.cancel(product_id, order_id)
+                self._after_write()
+                return True
+            # Not resting: it either never reached the engine or already filled
+            self.flush()
+        return Order.objects.filter(id=order_id, status=OrderStatus.PENDING, accepted=False).update(
+            status=OrderStatus.CANCELED
+        ) > 0
+
+    def _after_write(self):
+        self.journal.commit()
+        if len(self.engine.writer) >= self.flush_batch:
+            self.flush()
+
+    def _write_batch(self):
+        # Write-ahead: the journal is durable before the tables reflect it
+        lsn = self.journal.commit(force=True)
+        if len(self.engine.writer) or lsn != self.checkpoint_lsn:
+            with transaction.atomic():
+                self.engine.flush()
+                JournalCheckpoint.objects.update_or_create(shard=self.id, defaults={"lsn": lsn})
+            self.checkpoint_lsn = lsn
+        self.flushed_at = time.monotonic()
+        return lsn
+
+    def flush(self):
+        with self.lock:
+            lsn = self._write_batch()
+            if lsn - self.snapshot_lsn >= self.snapshot_records:
+                self.snapshot()
+
+    def snapshot(self):
+        with self.lock:
+            lsn = self._write_batch()
+            orders = [
+                (order.id, book.product_id, order.side == OrderType.BUY, order.quantity, order.remaining, order.price)
+                for book in self.engine.books.values()
+                for order in book.resting()
+            ]
+            write_snapshot(self.snapshot_path, lsn, orders)
+            # Everything up to lsn is now in the snapshot and the tables
+            self.journal.truncate()
+            self.snapshot_lsn = lsn
+            self.seen.clear()
+
+    def close(self):
+        """Stop the commit thread, write what is pending and close the journal."""
+        if self.stopped.is_set():
+            return
+        self.stopped.set()
+        self.thread.join()
+        with self.lock:
+            self.flush()
+            self.journal.close()
+
+    def _commit_loop(self):
+        # Group commit for idle periods: sync the journal tail and flush
+        # pending writes even when no new orders arrive
+        try:
+            while not self.stopped.wait(self.journal.sync_interval):
+                # This thread holds its own connection; drop it once it is
+                # broken or expired so a database restart does not stall flushes
+                close_old_connections()
+                try:
+                    self.journal.commit()
+                    if len(self.engine.writer) and time.monotonic() - self.flushed_at >= self.flush_interval:
+                        self.flush()
+                except Exception:
+                    logger.exception("Background commit failed for shard %s", self.id)
+        finally:
+            connection.close()
+
+
+class ShardWorker:
+    """Shards served by one worker process, recovered on first use.
+
+    Every shard queue has a single consumer, so orders for a product are
+    applied strictly in the order they were queued while other shards run
+    in parallel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.shards = {}
+
+    def shard(self, product_id):
+        shard_id = shard_for(product_id)
+        with self._lock:
+            if shard_id not in self.shards:
+                self.shards[shard_id] = Shard(shard_id)
+            return self.shards[shard_id]
+
+    def place(self, order_id, product_id):
+        # Recover before claiming: recovery resubmits claimed orders itself
+        shard = self.shard(product_id)
+        # Claiming the row keeps order_service.complete_orders away from it
+        claimed = Order.objects.filter(id=order_id, status=OrderStatus.PENDING, accepted=False).update(accepted=True)
+        if not claimed:
+            # Redelivered, or completed or canceled before it got here
+            return []
+        return shard.place(Order.objects.get(id=order_id))
+
+    def cancel(self, order_id, product_id):
+        return self.shard(product_id).cancel(order_id, product_id)
+
+    def close(self):
+        with self._lock:
+            shards, self.shards = self.shards, {}
+        for shard in shards.values():
+            shard.close()
+
+
+worker = ShardWorker()
@@ -2,6 +2,8 @@ from celery import shared_task
 from django.core.mail import send_mail
 
 from mini_project import settings
+from trading.models import Order
+from trading.shards import shard_queue, worker
 
 
 @shared_task
@@ -24,3 +26,29 @@ def send_order_status_email(email, order_id, status):
         fail_silently=False,
     )
     return f"Email sent to {email} about order #{order_id} status: {status}"
+
+
+def notify_orders(order_ids, status):
+    for order_id, email in Order.objects.filter(id__in=order_ids).values_list("id", "user__email"):
+        send_order_status_email.delay(email, order_id, status)
+
+
+# Routed per call to the product's shard queue, see trading.shards.shard_queue
+@shared_task(acks_late=True)
+def match_order(order_id, product_id):
+    completed = worker.place(order_id, product_id)
+    notify_orders(completed, "completed")
+    return completed
+
+
+@shared_task(acks_late=True)
+def cancel_order(order_id, product_id):
+    canceled = worker.cancel(order_id, product_id)
+    if canceled:
+        notify_orders([order_id], "canceled")
+    return canceled
+
+
+def request_cancel(order_id, product_id):
+    # The shard worker cancels it after any fills already queued ahead of it
+    cancel_order.apply_async((order_id, product_id), queue=shard_queue(product_id))
@@ -1,3 +1,363 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from products.models import Category, Product
+from trading.journal import CANCEL, CREATE, FILL, Journal, JournalError, read_records, read_snapshot, write_snapshot
+from trading.models import JournalCheckpoint, Order, OrderStatus, OrderType, Transaction
+from trading.order_service import BookOrder, FillWriter, MatchingEngine, OrderBook, complete_order, complete_orders
+from trading.shards import Shard, ShardWorker, shard_for, shard_queue
+from trading.views import OrderViewSet
+from users.models import User
+
+
+class TradingDataMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="trader", email="trader@example.com", password="pass", role="trader")
+        cls.admin = User.objects.create_user(username="admin", email="admin@example.com", password="pass", role="admin")
+        category = Category.objects.create(name="Metals")
+        cls.product = Product.objects.create(name="Gold", price=Decimal("2.50"), category=category)
+
+    def order(self, order_type, quantity, price=None, **fields):
+        return Order.objects.create(
+            user=self.user, product=self.product, order_type=order_type, quantity=quantity, price=price, **fields
+        )
+
+
+class JournalDirMixin:
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        # Flushes happen only where a test asks for them, never from the commit thread
+        journal_settings = override_settings(TRADING_JOURNAL_DIR=self.directory, TRADING_FLUSH_INTERVAL=3600)
+        journal_settings.enable()
+        self.addCleanup(journal_settings.disable)
+
+    def shard(self, shard_id):
+        shard = Shard(shard_id)
+        self.addCleanup(shard.close)
+        return shard
+
+    def worker(self):
+        worker = ShardWorker()
+        self.addCleanup(worker.close)
+        return worker
+
+
+class OrderBookTests(SimpleTestCase):
+    def setUp(self):
+        self.book = OrderBook(product_id=1)
+
+    def fills(self, order):
+        return [(fill.buy.id, fill.sell.id, fill.price, fill.quantity) for fill in self.book.add(order)]
+
+    def test_best_price_fills_first_then_earliest_arrival(self):
+        self.book.add(BookOrder(1, OrderType.SELL, 2, price=101))
+        self.book.add(BookOrder(2, OrderType.SELL, 2, price=100))
+        self.book.add(BookOrder(3, OrderType.SELL, 2, price=100))
+
+        self.assertEqual(
+            self.fills(BookOrder(4, OrderType.BUY, 5, price=101)),
+            [(4, 2, 100, 2), (4, 3, 100, 2), (4, 1, 101, 1)],
+        )
+        self.assertEqual(self.book.best_ask(), 101)
+
+    def test_limit_price_stops_matching_and_the_rest_rests(self):
+        self.book.add(BookOrder(1, OrderType.SELL, 3, price=100))
+        self.book.add(BookOrder(2, OrderType.SELL, 3, price=105))
+        buy = BookOrder(3, OrderType.BUY, 5, price=102)
+
+        self.assertEqual(self.fills(buy), [(3, 1, 100, 3)])
+        self.assertEqual((buy.status, buy.filled, buy.remaining), (OrderStatus.PENDING, 3, 2))
+        self.assertEqual(self.book.best_bid(), 102)
+        self.assertEqual(self.book.best_ask(), 105)
+
+    def test_market_order_cancels_what_it_cannot_fill(self):
+        self.book.add(BookOrder(1, OrderType.BUY, 2, price=100))
+        sell = BookOrder(2, OrderType.SELL, 5)
+
+        self.assertEqual(self.fills(sell), [(1, 2, 100, 2)])
+        self.assertEqual((sell.status, sell.remaining), (OrderStatus.CANCELED, 3))
+        self.assertIsNone(self.book.best_bid())
+        self.assertIsNone(self.book.best_ask())
+
+    def test_canceled_orders_are_skipped(self):
+        self.book.add(BookOrder(1, OrderType.SELL, 2, price=100))
+        self.book.add(BookOrder(2, OrderType.SELL, 2, price=101))
+
+        self.assertEqual(self.book.cancel(1).status, OrderStatus.CANCELED)
+        self.assertIsNone(self.book.cancel(1))
+        self.assertEqual(self.book.best_ask(), 101)
+        self.assertEqual(self.fills(BookOrder(3, OrderType.BUY, 1, price=101)), [(3, 2, 101, 1)])
+        self.assertEqual([order.id for order in self.book.resting()], [2])
+
+
+class FillWriterTests(TradingDataMixin, TestCase):
+    def test_flush_writes_fills_and_order_state(self):
+        sell = self.order(OrderType.SELL, 3, Decimal("1.00"))
+        buy = self.order(OrderType.BUY, 5, Decimal("1.20"))
+        engine = MatchingEngine(FillWriter(batch_size=None))
+        engine.submit_order(sell)
+        engine.submit_order(buy)
+
+        with self.assertNumQueries(4):
+            self.assertEqual(engine.flush(), 2)
+
+        self.assertEqual(
+            sorted(Transaction.objects.values_list("order_id", "quantity", "price")),
+            [(sell.id, 3, Decimal("3.00")), (buy.id, 3, Decimal("3.00"))],
+        )
+        sell.refresh_from_db()
+        buy.refresh_from_db()
+        self.assertEqual((sell.status, sell.filled_quantity, sell.accepted), (OrderStatus.COMPLETED, 3, True))
+        self.assertEqual((buy.status, buy.remaining_quantity), (OrderStatus.PENDING, 2))
+
+    def test_load_rests_accepted_limit_orders_with_their_remainder(self):
+        self.order(OrderType.BUY, 5, Decimal("1.00"), accepted=True, filled_quantity=2)
+        self.order(OrderType.BUY, 5, Decimal("1.10"))
+        self.order(OrderType.SELL, 5, accepted=True)
+        engine = MatchingEngine()
+
+        self.assertEqual(engine.load(), 1)
+        (resting,) = engine.book(self.product.id).resting()
+        self.assertEqual((resting.price, resting.remaining), (100, 3))
+
+
+@override_settings(TRADING_SHARDS=3)
+class ShardRoutingTests(TradingDataMixin, TestCase):
+    def call(self, method, action, order=None, data=None, user=None):
+        path = f"/orders/{order.id}/" if order else "/orders/"
+        request = getattr(APIRequestFactory(), method)(path, data, format="json")
+        force_authenticate(request, user or self.user)
+        kwargs = {"pk": order.id} if order else {}
+        return OrderViewSet.as_view({method: action})(request, **kwargs)
+
+    def test_products_map_to_a_fixed_shard_queue(self):
+        self.assertEqual([shard_for(product_id) for product_id in range(6)], [0, 1, 2, 0, 1, 2])
+        self.assertEqual(shard_queue(7), "trading.shard.1")
+
+    @mock.patch("trading.views.send_order_status_email")
+    @mock.patch("trading.views.match_order")
+    def test_new_orders_are_queued_on_their_product_shard(self, match_order, send_email):
+        response = self.call("post", "create", data={"product": self.product.id, "order_type": "buy", "quantity": 2})
+
+        self.assertEqual(response.status_code, 201)
+        match_order.apply_async.assert_called_once_with(
+            (response.data["id"], self.product.id), queue=shard_queue(self.product.id)
+        )
+
+    def test_unclaimed_orders_can_be_edited_but_not_moved_to_another_product(self):
+        order = self.order(OrderType.BUY, 2, Decimal("1.00"))
+        other = Product.objects.create(name="Silver", price=Decimal("1.00"), category=self.product.category)
+
+        self.assertEqual(self.call("patch", "partial_update", order, {"quantity": 3}).status_code, 200)
+        self.assertEqual(self.call("patch", "partial_update", order, {"product": other.id}).status_code, 400)
+
+    def test_claimed_orders_cannot_be_edited_or_deleted(self):
+        order = self.order(OrderType.BUY, 2, Decimal("1.00"), accepted=True)
+
+        self.assertEqual(self.call("patch", "partial_update", order, {"quantity": 3}).status_code, 409)
+        self.assertEqual(self.call("delete", "destroy", order).status_code, 409)
+        order.refresh_from_db()
+        self.assertEqual(order.quantity, 2)
+
+    @mock.patch("trading.tasks.cancel_order")
+    def test_cancel_is_queued_on_the_product_shard(self, cancel_order):
+        order = self.order(OrderType.BUY, 2, Decimal("1.00"), accepted=True)
+
+        response = self.call("post", "cancel", order)
+
+        self.assertEqual(response.status_code, 202)
+        cancel_order.apply_async.assert_called_once_with((order.id, self.product.id), queue=shard_queue(self.product.id))
+        order.refresh_from_db()
+        self.assertEqual(order.status, OrderStatus.PENDING)
+
+
+class JournalTests(JournalDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.directory, "shard-0.journal")
+
+    def test_records_round_trip(self):
+        journal = Journal(self.path)
+        journal.append(CREATE, 1, 7, True, 5, 5, 120)
+        journal.append(FILL, 7, 1, 2, 120, 3)
+        journal.append(CANCEL, 1, 7)
+        self.assertEqual(journal.commit(force=True), 3)
+        journal.close()
+
+        self.assertEqual(
+            list(read_records(self.path)),
+            [(1, CREATE, (1, 7, True, 5, 5, 120)), (2, FILL, (7, 1, 2, 120, 3)), (3, CANCEL, (1, 7))],
+        )
+
+    def test_reopening_cuts_a_torn_tail_and_continues_numbering(self):
+        journal = Journal(self.path)
+        journal.append(CREATE, 1, 7, False, 5, 5, -1)
+        journal.append(CANCEL, 1, 7)
+        journal.close()
+        valid_length = os.path.getsize(self.path)
+        with open(self.path, "ab") as file:
+            file.write(b"\x03\x00\x00torn")
+
+        journal = Journal(self.path)
+        self.assertEqual(os.path.getsize(self.path), valid_length)
+        self.assertEqual(journal.append(CANCEL, 2, 7), 3)
+        journal.close()
+        self.assertEqual([lsn for lsn, _, _ in read_records(self.path)], [1, 2, 3])
+
+    def test_numbering_continues_after_truncation(self):
+        journal = Journal(self.path)
+        journal.append(CANCEL, 1, 7)
+        journal.truncate()
+        journal.close()
+
+        journal = Journal(self.path, start_lsn=1)
+        self.assertEqual(journal.append(CANCEL, 2, 7), 2)
+        journal.close()
+
+    def test_snapshot_round_trip_and_corruption(self):
+        path = os.path.join(self.directory, "shard-0.snapshot")
+        orders = [(1, 7, True, 5, 3, 120), (2, 7, False, 4, 4, 130)]
+
+        self.assertIsNone(read_snapshot(path))
+        write_snapshot(path, 9, orders)
+        self.assertEqual(read_snapshot(path), (9, orders))
+
+        with open(path, "r+b") as file:
+            file.seek(-6, os.SEEK_END)
+            file.write(b"\xff")
+        with self.assertRaises(JournalError):
+            read_snapshot(path)
+
+
+class ShardRecoveryTests(JournalDirMixin, TradingDataMixin, TestCase):
+    def test_journaled_fills_missing_from_the_tables_are_replayed(self):
+        shard = self.shard(shard_for(self.product.id))
+        sell = self.order(OrderType.SELL, 3, Decimal("1.00"), accepted=True)
+        shard.place(sell)
+        shard.flush()
+        buy = self.order(OrderType.BUY, 1, Decimal("1.00"), accepted=True)
+        shard.place(buy)
+        # Crash after the journal synced but before the fills reached the tables
+        shard.journal.commit(force=True)
+        self.assertFalse(Transaction.objects.exists())
+
+        recovered = self.shard(shard.id)
+
+        buy.refresh_from_db()
+        sell.refresh_from_db()
+        self.assertEqual(buy.status, OrderStatus.COMPLETED)
+        self.assertEqual((sell.status, sell.filled_quantity), (OrderStatus.PENDING, 1))
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.assertEqual(
+            [(order.id, order.remaining) for order in recovered.engine.book(self.product.id).resting()],
+            [(sell.id, 2)],
+        )
+        self.assertEqual(JournalCheckpoint.objects.get(shard=shard.id).lsn, recovered.journal.lsn)
+
+    def test_unreadable_snapshot_rebuilds_from_the_tables(self):
+        shard = self.shard(shard_for(self.product.id))
+        sell = self.order(OrderType.SELL, 3, Decimal("1.00"), accepted=True)
+        shard.place(sell)
+        shard.snapshot()
+        with open(shard.snapshot_path, "wb") as file:
+            file.write(b"garbage")
+
+        with self.assertLogs("trading.shards", "WARNING") as logs:
+            recovered = self.shard(shard.id)
+
+        self.assertIn("Rebuilding shard", logs.output[-1])
+        self.assertEqual([order.id for order in recovered.engine.book(self.product.id).resting()], [sell.id])
+        self.assertFalse(Transaction.objects.exists())
+
+
+    def test_close_stops_the_commit_thread_and_writes_pending_fills(self):
+        shard = self.shard(shard_for(self.product.id))
+        shard.place(self.order(OrderType.SELL, 1, Decimal("1.00"), accepted=True))
+        shard.place(self.order(OrderType.BUY, 1, Decimal("1.00"), accepted=True))
+
+        shard.close()
+
+        self.assertFalse(shard.thread.is_alive())
+        self.assertEqual(Transaction.objects.count(), 2)
+
+
+class OrderCompletionTests(JournalDirMixin, TradingDataMixin, TestCase):
+    def call(self, method, action, data=None, order=None):
+        path = f"/orders/{order.id}/{action}/" if order else f"/orders/{action}/"
+        request = APIRequestFactory().post(path, data, format="json")
+        force_authenticate(request, self.admin)
+        kwargs = {"pk": order.id} if order else {}
+        return OrderViewSet.as_view({method: action.replace("-", "_")})(request, **kwargs)
+
+    def test_completes_the_remainder_at_product_price(self):
+        order = self.order(OrderType.BUY, 5, Decimal("1.00"), filled_quantity=2)
+
+        with self.assertNumQueries(5):
+            self.assertEqual(complete_orders([order.id]), [order.id])
+
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.filled_quantity), (OrderStatus.COMPLETED, 5))
+        self.assertEqual(list(order.transactions.values_list("quantity", "price")), [(3, Decimal("7.50"))])
+        self.assertFalse(complete_order(order.id))
+        self.assertEqual(order.transactions.count(), 1)
+
+    def test_batch_skips_claimed_and_finished_orders(self):
+        pending = self.order(OrderType.BUY, 1)
+        claimed = self.order(OrderType.BUY, 1, Decimal("1.00"), accepted=True)
+        canceled = self.order(OrderType.SELL, 1, status=OrderStatus.CANCELED)
+
+        self.assertEqual(complete_orders([pending.id, claimed.id, canceled.id]), [pending.id])
+        self.assertEqual(list(Transaction.objects.values_list("order_id", flat=True)), [pending.id])
+
+    @mock.patch("trading.views.send_order_status_email")
+    def test_complete_returns_409_for_orders_it_cannot_complete(self, send_email):
+        claimed = self.order(OrderType.BUY, 1, Decimal("1.00"), accepted=True)
+        pending = self.order(OrderType.BUY, 1)
+
+        self.assertEqual(self.call("post", "complete", order=claimed).status_code, 409)
+        self.assertEqual(self.call("post", "complete", order=pending).status_code, 200)
+        self.assertEqual(self.call("post", "complete", order=pending).status_code, 409)
+        send_email.delay.assert_called_once_with(self.user.email, pending.id, "completed")
+
+    @mock.patch("trading.views.send_order_status_email")
+    def test_bulk_complete_reports_skipped_orders(self, send_email):
+        pending = self.order(OrderType.BUY, 1)
+        claimed = self.order(OrderType.BUY, 1, Decimal("1.00"), accepted=True)
+
+        response = self.call("post", "bulk-complete", {"ids": [claimed.id, pending.id]})
+
+        self.assertEqual(response.data, {"completed": [pending.id], "skipped": [claimed.id]})
+        self.assertEqual(self.call("post", "bulk-complete", {"ids": "1,2"}).status_code, 400)
+
+    def test_an_order_is_claimed_by_the_engine_only_once(self):
+        sell = self.order(OrderType.SELL, 2, Decimal("1.00"))
+        buy = self.order(OrderType.BUY, 2, Decimal("1.00"))
+        worker = self.worker()
+
+        self.assertEqual(worker.place(sell.id, self.product.id), [])
+        self.assertCountEqual(worker.place(buy.id, self.product.id), [sell.id, buy.id])
+        # Redelivery of an already claimed order changes nothing
+        self.assertEqual(worker.place(sell.id, self.product.id), [])
+        self.assertEqual(worker.place(buy.id, self.product.id), [])
+
+        shard = worker.shard(self.product.id)
+        shard.flush()
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.assertFalse(complete_order(buy.id))
+
+    def test_completed_orders_are_not_claimed_by_the_engine(self):
+        order = self.order(OrderType.BUY, 2, Decimal("1.00"))
+        complete_order(order.id)
+        worker = self.worker()
+
+        self.assertEqual(worker.place(order.id, self.product.id), [])
+        self.assertEqual(worker.shard(self.product.id).engine.book(self.product.id).resting(), [])
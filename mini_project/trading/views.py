@@ -1,12 +1,14 @@
-from decimal import Decimal
-
-from rest_framework import viewsets, permissions
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from trading.models import Order, Transaction
-from trading.serializers import OrderSerializer, TransactionSerializer
+from trading.models import Order, OrderStatus, Transaction
+from trading.order_service import complete_order, complete_orders
+from trading.serializers import OrderAckSerializer, OrderSerializer, TransactionSerializer
+from trading.shards import shard_queue
 from users.permissions import IsAdmin, IsOwnerOrAdmin
-from .tasks import send_order_status_email
+from .tasks import match_order, request_cancel, send_order_status_email
 
 
 class OrderViewSet(viewsets.ModelViewSet):
@@ -16,22 +18,69 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         order = serializer.save(user=self.request.user)
+        # One consumer per shard queue keeps each product's orders in sequence
+        match_order.apply_async((order.id, order.product_id), queue=shard_queue(order.product_id))
         send_order_status_email.delay(order.user.email, order.id, "created")
 
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            if not self.lock_unclaimed(self.get_object()):
+                return self.claimed_response()
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            if not self.lock_unclaimed(self.get_object()):
+                return self.claimed_response()
+            return super().destroy(request, *args, **kwargs)
+
+    def lock_unclaimed(self, order):
+        # The row lock holds off ShardWorker.place's claim until the edit commits
+        return Order.objects.select_for_update().filter(
+            id=order.id, status=OrderStatus.PENDING, accepted=False
+        ).exists()
+
+    def claimed_response(self):
+        # Claimed orders live in a shard's in-memory book; only cancel_order may change them
+        return Response(
+            {"detail": "Only pending orders not yet taken by the matching engine can be changed. Cancel it instead."},
+            status=status.HTTP_409_CONFLICT,
+        )
+
     @action(detail=True, methods=["post"], permission_classes=[IsAdmin])
     def complete(self, request, pk=None):
         order = self.get_object()
-        order.mark_as_completed()
-        Transaction.objects.create(order=order, price=Decimal(order.product.price) * order.quantity)
+        if not complete_order(order.id):
+            return Response(
+                {"detail": "Order is no longer pending or is being matched."}, status=status.HTTP_409_CONFLICT
+            )
         send_order_status_email.delay(order.user.email, order.id, "completed")
         return Response({"status": "completed"})
 
+    @action(detail=False, methods=["post"], url_path="bulk-complete", permission_classes=[IsAdmin])
+    def bulk_complete(self, request):
+        ids = request.data.get("ids")
+        if not isinstance(ids, list) or not all(isinstance(order_id, int) for order_id in ids):
+            return Response({"ids": "Expected a list of order ids."}, status=status.HTTP_400_BAD_REQUEST)
+        # Orders locked by another request are skipped rather than waited on
+        completed = complete_orders(ids)
+        for order_id, email in Order.objects.filter(id__in=completed).values_list("id", "user__email"):
+            send_order_status_email.delay(email, order_id, "completed")
+        return Response({"completed": completed, "skipped": sorted(set(ids) - set(completed))})
+
     @action(detail=True, methods=["post"], permission_classes=[IsOwnerOrAdmin])
     def cancel(self, request, pk=None):
         order = self.get_object()
-        order.mark_as_canceled()
-        send_order_status_email.delay(order.user.email, order.id, "canceled")
-        return Response({"status": "canceled"})
+        request_cancel(order.id, order.product_id)
+        return Response({"status": "cancel_requested", "ack_id": order.ack_id}, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=["get"], url_path=r"acks/(?P<ack_id>[0-9a-f-]{36})")
+    def ack(self, request, ack_id=None):
+        orders = Order.objects.prefetch_related("transactions")
+        if request.user.role != "admin":
+            orders = orders.filter(user=request.user)
+        order = get_object_or_404(orders, ack_id=ack_id)
+        return Response(OrderAckSerializer(order).data)
 
 
 class TransactionViewSet(viewsets.ReadOnlyModelViewSet):